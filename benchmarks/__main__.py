@@ -0,0 +1,49 @@
+import argparse
+import asyncio
+import logging
+import sys
+
+from .cases import BenchEnvironment, run_cases
+from .runner import compare, report, save
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Benchmarks for the CRUD hot paths")
+    parser.add_argument("--rows", type=int, default=10000, help="rows seeded into the SQL table")
+    parser.add_argument("--iterations", type=int, default=200, help="measured operations per case")
+    parser.add_argument("--sql-url", default="sqlite+aiosqlite://", help="async SQLAlchemy url")
+    parser.add_argument("--redis-url", default=None,
+                        help="redis-stack url, enables RediSearch cases (default: in-memory fakeredis)")
+    parser.add_argument("-k", dest="selected", action="append", help="run cases whose name contains this")
+    parser.add_argument("--json", dest="json_path", help="write results to this file")
+    parser.add_argument("--baseline", help="compare against a previous --json file")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative p50/throughput change reported as a regression")
+    return parser.parse_args()
+
+
+async def main(args: argparse.Namespace) -> int:
+    env = BenchEnvironment(rows=args.rows, sql_url=args.sql_url, redis_url=args.redis_url)
+    await env.start()
+    try:
+        results = await run_cases(env, args.iterations, args.selected)
+    finally:
+        await env.close()
+
+    print(report(results))
+    if args.json_path:
+        save(results, args.json_path)
+
+    if args.baseline:
+        text, regressions = compare(results, args.baseline, args.threshold)
+        print()
+        print(text)
+        if regressions:
+            logging.error(f"regressions: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
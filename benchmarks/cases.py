@@ -0,0 +1,336 @@
+import itertools
+from typing import Any, Awaitable, Callable, Optional
+
+from aredis_om import Migrator
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from database.interfaces.local_cache import LocalCache
+from database.interfaces.main_interface import MainCRUDInterface
+from database.interfaces.memory import BaseMemoryInterface
+from database.interfaces.redis_json import BaseRedisInterface
+from database.interfaces.sql import BaseSQLInterface
+from database.models import Base
+from database.models.user import UserModel
+from tests.schemas.user import UserSchemas, UserCreate, UserUpdate, UserFilters
+from .runner import BenchResult, measure
+
+
+class BenchEnvironment:
+    def __init__(self,
+                 rows: int = 10000,
+                 sql_url: str = "sqlite+aiosqlite://",
+                 redis_url: Optional[str] = None):
+        self.rows = rows
+        self.sql_url = sql_url
+        self.redis_url = redis_url
+        self.search = redis_url is not None
+        self.engine = None
+        self.redis = None
+        self.__tg_ids = itertools.count(10 ** 9)
+
+    def next_tg_id(self) -> int:
+        return next(self.__tg_ids)
+
+    def session(self) -> AsyncSession:
+        return AsyncSession(self.engine, expire_on_commit=False)
+
+    async def start(self):
+        if self.sql_url.startswith("sqlite"):
+            self.engine = create_async_engine(self.sql_url, poolclass=StaticPool)
+        else:
+            self.engine = create_async_engine(self.sql_url)
+
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(insert(UserModel), [
+                {"tg_id": i, "fio": f"Aboba {i}", "group": f"XD {i % 100}", "allow": bool(i % 2)}
+                for i in range(self.rows)
+            ])
+
+        if self.redis_url is not None:
+            from redis.asyncio import from_url
+
+            self.redis = from_url(self.redis_url, decode_responses=True)
+        else:
+            import fakeredis
+
+            self.redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+        UserSchemas._meta.database = self.redis
+        await self.clear_cache()
+        if self.search:
+            await Migrator().run()
+
+    async def clear_cache(self):
+        keys = [key async for key in self.redis.scan_iter(match=UserSchemas.make_key("*"), count=1000)
+                if not key.endswith(":index")]
+        for start in range(0, len(keys), 1000):
+            await self.redis.unlink(*keys[start:start + 1000])
+
+    async def close(self):
+        await self.clear_cache()
+        await self.engine.dispose()
+
+    def sql(self, session: AsyncSession) -> BaseSQLInterface:
+        return BaseSQLInterface(session, UserModel, UserSchemas, UserCreate, UserUpdate, UserFilters)
+
+    def redis_interface(self) -> BaseRedisInterface:
+        return BaseRedisInterface(UserSchemas, UserFilters)
+
+    def main(self, **kwargs) -> MainCRUDInterface:
+        return MainCRUDInterface(UserModel, UserSchemas, UserCreate, UserUpdate, UserFilters,
+                                 **kwargs).prepare()
+
+    def new_users(self, count: int) -> list[UserCreate]:
+        users = []
+        for _ in range(count):
+            tg_id = self.next_tg_id()
+            users.append(UserCreate(tg_id=tg_id, fio=f"Aboba {tg_id}", group="XD new", allow=True))
+        return users
+
+    async def seed(self, count: int) -> list[UserSchemas]:
+        async with self.session() as session:
+            res = await self.sql(session).create(self.new_users(count), returning=True)
+            await session.commit()
+        return res
+
+
+async def sql_get_one(env: BenchEnvironment, iterations: int) -> BenchResult:
+    async with env.session() as session:
+        sql = env.sql(session)
+        return await measure("sql.get_one_or_none",
+                             lambda i: sql.get_one_or_none(id=i % env.rows + 1),
+                             iterations)
+
+
+async def sql_get_page(env: BenchEnvironment, iterations: int) -> BenchResult:
+    async with env.session() as session:
+        sql = env.sql(session)
+        return await measure("sql.get_all[limit=50]",
+                             lambda i: sql.get_all(limit=50, offset=i * 50 % env.rows),
+                             iterations, rows_per_op=50)
+
+
+async def sql_create_bulk(env: BenchEnvironment, iterations: int) -> BenchResult:
+    async with env.session() as session:
+        sql = env.sql(session)
+
+        async def run(i: int):
+            await sql.create(env.new_users(1000))
+            await session.commit()
+
+        return await measure("sql.create[bulk=1000]", run, max(iterations // 20, 3), warmup=1,
+                             rows_per_op=1000)
+
+
+async def sql_update(env: BenchEnvironment, iterations: int) -> BenchResult:
+    async with env.session() as session:
+        sql = env.sql(session)
+
+        async def run(i: int):
+            await sql.update({"fio": f"Updated {i}"}, id=i % env.rows + 1)
+            await session.commit()
+
+        return await measure("sql.update", run, iterations)
+
+
+async def sql_delete(env: BenchEnvironment, iterations: int) -> BenchResult:
+    ids = [item.id for item in await env.seed(iterations + 5)]
+    async with env.session() as session:
+        sql = env.sql(session)
+
+        async def run(i: int):
+            await sql.delete(id=ids[i])
+            await session.commit()
+
+        return await measure("sql.delete", run, iterations)
+
+
+async def redis_create_bulk(env: BenchEnvironment, iterations: int) -> BenchResult:
+    users = await env.seed(1000)
+    redis = env.redis_interface()
+    return await measure("redis.create[bulk=1000]", lambda i: redis.create(users),
+                         max(iterations // 20, 3), warmup=1, rows_per_op=1000)
+
+
+async def redis_get_by_ids(env: BenchEnvironment, iterations: int) -> BenchResult:
+    users = await env.seed(1000)
+    redis = env.redis_interface()
+    await redis.create(users)
+    ids = [item.id for item in users]
+    return await measure("redis.get_by_ids[50]",
+                         lambda i: redis.get_by_ids(ids[i * 50 % 1000:i * 50 % 1000 + 50]),
+                         iterations, rows_per_op=50)
+
+
+async def redis_delete_by_ids(env: BenchEnvironment, iterations: int) -> BenchResult:
+    users = await env.seed((iterations + 5) * 10)
+    redis = env.redis_interface()
+    await redis.create(users)
+    ids = [item.id for item in users]
+    return await measure("redis.delete_by_ids[10]", lambda i: redis.delete_by_ids(ids[i * 10:i * 10 + 10]),
+                         iterations, rows_per_op=10)
+
+
+async def redis_get_one(env: BenchEnvironment, iterations: int) -> BenchResult:
+    users = await env.seed(1000)
+    redis = env.redis_interface()
+    await redis.create(users)
+    return await measure("redis.get_one_or_none",
+                         lambda i: redis.get_one_or_none(tg_id=users[i % 1000].tg_id),
+                         iterations)
+
+
+async def redis_get_page(env: BenchEnvironment, iterations: int) -> BenchResult:
+    users = await env.seed(1000)
+    redis = env.redis_interface()
+    await redis.create(users)
+    return await measure("redis.get_all[limit=50]",
+                         lambda i: redis.get_all(group="XD new", limit=50, offset=i * 50 % 1000),
+                         iterations, rows_per_op=50)
+
+
+async def main_get_one_local(env: BenchEnvironment, iterations: int) -> BenchResult:
+    local_cache = LocalCache(max_size=env.rows)
+    async with env.session() as session:
+        warm = min(env.rows, 1000)
+        for item in await env.sql(session).get_all(limit=warm):
+            local_cache.set(LocalCache.make_key(id=item.id), item)
+        main = env.main(local_cache=local_cache).bind(session)
+        return await measure("main.get_one_or_none[local warm]",
+                             lambda i: main.get_one_or_none(id=i % warm + 1),
+                             iterations)
+
+
+async def main_get_one_memory(env: BenchEnvironment, iterations: int) -> BenchResult:
+    async with env.session() as session:
+        main = env.main(cache_backend=BaseMemoryInterface(UserSchemas, UserFilters)).bind(session)
+        for i in range(iterations):
+            await main.get_one_or_none(id=i + 1)
+        return await measure("main.get_one_or_none[memory warm]",
+                             lambda i: main.get_one_or_none(id=i % iterations + 1),
+                             iterations, warmup=0)
+
+
+async def main_get_page_memory(env: BenchEnvironment, iterations: int) -> BenchResult:
+    async with env.session() as session:
+        main = env.main(cache_backend=BaseMemoryInterface(UserSchemas, UserFilters)).bind(session)
+        for i in range(iterations):
+            await main.get_all(limit=50, offset=i * 50 % env.rows)
+        return await measure("main.get_all[limit=50,memory warm]",
+                             lambda i: main.get_all(limit=50, offset=i % iterations * 50 % env.rows),
+                             iterations, warmup=0, rows_per_op=50)
+
+
+async def main_get_one_cold(env: BenchEnvironment, iterations: int) -> BenchResult:
+    await env.clear_cache()
+    async with env.session() as session:
+        main = env.main().bind(session)
+        return await measure("main.get_one_or_none[cold]",
+                             lambda i: main.get_one_or_none(id=i + 1),
+                             iterations, warmup=0)
+
+
+async def main_get_one_warm(env: BenchEnvironment, iterations: int) -> BenchResult:
+    async with env.session() as session:
+        main = env.main().bind(session)
+        for i in range(iterations):
+            await main.get_one_or_none(id=i + 1)
+        return await measure("main.get_one_or_none[redis warm]",
+                             lambda i: main.get_one_or_none(id=i % iterations + 1),
+                             iterations, warmup=0)
+
+
+async def main_get_page_cold(env: BenchEnvironment, iterations: int) -> BenchResult:
+    await env.clear_cache()
+    async with env.session() as session:
+        main = env.main().bind(session)
+        return await measure("main.get_all[limit=50,cold]",
+                             lambda i: main.get_all(limit=50, offset=i * 50 % env.rows),
+                             iterations, warmup=0, rows_per_op=50)
+
+
+async def main_get_page_warm(env: BenchEnvironment, iterations: int) -> BenchResult:
+    async with env.session() as session:
+        main = env.main().bind(session)
+        for i in range(iterations):
+            await main.get_all(limit=50, offset=i * 50 % env.rows)
+        return await measure("main.get_all[limit=50,warm]",
+                             lambda i: main.get_all(limit=50, offset=i % iterations * 50 % env.rows),
+                             iterations, warmup=0, rows_per_op=50)
+
+
+async def main_create_bulk(env: BenchEnvironment, iterations: int) -> BenchResult:
+    async with env.session() as session:
+        main = env.main().bind(session)
+
+        async def run(i: int):
+            await main.create(env.new_users(100), write_through=True)
+            await session.commit()
+
+        return await measure("main.create[write_through,bulk=100]", run, max(iterations // 10, 3),
+                             warmup=1, rows_per_op=100)
+
+
+async def main_update(env: BenchEnvironment, iterations: int) -> BenchResult:
+    async with env.session() as session:
+        main = env.main().bind(session)
+
+        async def run(i: int):
+            await main.update({"fio": f"Main {i}"}, id=i % env.rows + 1)
+            await session.commit()
+
+        return await measure("main.update", run, iterations)
+
+
+async def main_delete(env: BenchEnvironment, iterations: int) -> BenchResult:
+    ids = [item.id for item in await env.seed(iterations + 5)]
+    async with env.session() as session:
+        main = env.main().bind(session)
+
+        async def run(i: int):
+            await main.delete(id=ids[i])
+            await session.commit()
+
+        return await measure("main.delete[soft]", run, iterations)
+
+
+CASES: list[tuple[str, bool, Callable[[BenchEnvironment, int], Awaitable[BenchResult]]]] = [
+    ("sql.get_one_or_none", False, sql_get_one),
+    ("sql.get_all[limit=50]", False, sql_get_page),
+    ("sql.create[bulk=1000]", False, sql_create_bulk),
+    ("sql.update", False, sql_update),
+    ("sql.delete", False, sql_delete),
+    ("redis.create[bulk=1000]", False, redis_create_bulk),
+    ("redis.get_by_ids[50]", False, redis_get_by_ids),
+    ("redis.delete_by_ids[10]", False, redis_delete_by_ids),
+    ("redis.get_one_or_none", True, redis_get_one),
+    ("redis.get_all[limit=50]", True, redis_get_page),
+    ("main.get_one_or_none[local warm]", False, main_get_one_local),
+    ("main.get_one_or_none[memory warm]", False, main_get_one_memory),
+    ("main.get_all[limit=50,memory warm]", False, main_get_page_memory),
+    ("main.get_one_or_none[cold]", True, main_get_one_cold),
+    ("main.get_one_or_none[redis warm]", True, main_get_one_warm),
+    ("main.get_all[limit=50,cold]", False, main_get_page_cold),
+    ("main.get_all[limit=50,warm]", False, main_get_page_warm),
+    ("main.create[write_through,bulk=100]", False, main_create_bulk),
+    ("main.update", False, main_update),
+    ("main.delete[soft]", False, main_delete),
+]
+
+
+async def run_cases(env: BenchEnvironment,
+                    iterations: int,
+                    selected: Optional[list[str]] = None) -> list[BenchResult]:
+    results = []
+    for name, needs_search, case in CASES:
+        if selected and not any(pattern in name for pattern in selected):
+            continue
+        if needs_search and not env.search:
+            results.append(BenchResult(name, [], skipped="needs redis-stack (--redis-url)"))
+            continue
+        results.append(await case(env, iterations))
+    return results
@@ -0,0 +1,108 @@
+import json
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+
+class BenchResult:
+    def __init__(self,
+                 name: str,
+                 latencies: list[float],
+                 rows_per_op: int = 1,
+                 skipped: Optional[str] = None):
+        self.name = name
+        self.latencies = sorted(latencies)
+        self.rows_per_op = rows_per_op
+        self.skipped = skipped
+
+    @property
+    def ops(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def total(self) -> float:
+        return sum(self.latencies)
+
+    @property
+    def throughput(self) -> float:
+        return self.ops / self.total if self.total else 0.0
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies:
+            return 0.0
+        index = min(len(self.latencies) - 1, int(round(q * (len(self.latencies) - 1))))
+        return self.latencies[index]
+
+    @property
+    def p50(self) -> float:
+        return self.percentile(0.5)
+
+    @property
+    def p99(self) -> float:
+        return self.percentile(0.99)
+
+    def to_dict(self) -> dict[str, Any]:
+        if self.skipped:
+            return {"skipped": self.skipped}
+        return {
+            "ops": self.ops,
+            "rows_per_op": self.rows_per_op,
+            "ops_per_sec": self.throughput,
+            "p50_ms": self.p50 * 1000,
+            "p99_ms": self.p99 * 1000,
+        }
+
+
+async def measure(name: str,
+                  func: Callable[[int], Awaitable[Any]],
+                  iterations: int,
+                  warmup: int = 5,
+                  rows_per_op: int = 1) -> BenchResult:
+    for i in range(warmup):
+        await func(i)
+
+    latencies = []
+    for i in range(warmup, warmup + iterations):
+        start = time.perf_counter()
+        await func(i)
+        latencies.append(time.perf_counter() - start)
+    return BenchResult(name, latencies, rows_per_op=rows_per_op)
+
+
+def report(results: list[BenchResult]) -> str:
+    width = max(len(result.name) for result in results)
+    lines = [f"{'benchmark':<{width}}  {'ops':>6}  {'ops/s':>10}  {'rows/s':>10}  {'p50 ms':>8}  {'p99 ms':>8}"]
+    for result in results:
+        if result.skipped:
+            lines.append(f"{result.name:<{width}}  skipped: {result.skipped}")
+            continue
+        lines.append(f"{result.name:<{width}}  {result.ops:>6}  {result.throughput:>10.1f}  "
+                     f"{result.throughput * result.rows_per_op:>10.1f}  "
+                     f"{result.p50 * 1000:>8.3f}  {result.p99 * 1000:>8.3f}")
+    return "\n".join(lines)
+
+
+def save(results: list[BenchResult], path: str):
+    with open(path, "w") as file:
+        json.dump({result.name: result.to_dict() for result in results}, file, indent=2)
+
+
+def compare(results: list[BenchResult], baseline_path: str, threshold: float) -> tuple[str, list[str]]:
+    with open(baseline_path) as file:
+        baseline = json.load(file)
+
+    lines = []
+    regressions = []
+    for result in results:
+        base = baseline.get(result.name)
+        if result.skipped or not base or "skipped" in base:
+            continue
+
+        p50 = result.p50 * 1000 / base["p50_ms"] - 1 if base["p50_ms"] else 0.0
+        p99 = result.p99 * 1000 / base["p99_ms"] - 1 if base["p99_ms"] else 0.0
+        throughput = result.throughput / base["ops_per_sec"] - 1 if base["ops_per_sec"] else 0.0
+        regressed = p50 > threshold or throughput < -threshold
+        if regressed:
+            regressions.append(result.name)
+        lines.append(f"{result.name}: ops/s {throughput:+.1%}, p50 {p50:+.1%}, p99 {p99:+.1%}"
+                     f"{'  REGRESSION' if regressed else ''}")
+    return "\n".join(lines), regressions
@@ -1,3 +1,13 @@
 from .redis_json import BaseRedisInterface, BaseRedisModel
 from .sql import BaseSQLInterface
-from .main_interface import MainCRUDInterface
\ No newline at end of file
+from .main_interface import MainCRUDInterface
+from .memory import BaseMemoryInterface
+from .local_cache import LocalCache
+from .single_flight import SingleFlight
+from .batch_loader import BatchLoader
+from .write_behind import WriteBehindQueue
+from .cache_policy import CachePolicy
+from .invalidation import InvalidationBus
+from .metrics import Metrics
+from .serializers import BlobSerializer
+from .registry import CRUDRegistry
\ No newline at end of file
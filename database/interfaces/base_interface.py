@@ -1,6 +1,9 @@
 import logging
 from abc import abstractmethod
+from datetime import datetime, date, time
+from decimal import Decimal
 from typing import Any, get_args
+from uuid import UUID
 
 from pydantic import BaseModel
 
@@ -35,19 +38,62 @@ class BaseDBInterface:
         pass
 
 
+class BaseCacheInterface(BaseDBInterface):
+    backend_name = "cache"
+
+    @abstractmethod
+    async def migrate(self) -> Any:
+        pass
+
+    @abstractmethod
+    async def get_by_ids(self, *args, **kwargs) -> Any:
+        pass
+
+    @abstractmethod
+    async def get_by_values(self, *args, **kwargs) -> Any:
+        pass
+
+    @abstractmethod
+    async def delete_by_ids(self, *args, **kwargs) -> bool:
+        pass
+
+
 class SchemasValidator:
-    @staticmethod
-    async def valid_schema(schema: BaseModel.model_json_schema, **kwargs) -> dict:
+    _plain_types = (int, float, str, bool, bytes, datetime, date, time, Decimal, UUID)
+    _schema_plans: dict[Any, tuple[dict[str, Any], bool]] = {}
+
+    @classmethod
+    def compile_schema(cls, schema: BaseModel.model_json_schema) -> tuple[dict[str, Any], bool]:
+        plan = cls._schema_plans.get(schema)
+        if plan is None:
+            field_types = {}
+            for key, field in schema.model_fields.items():
+                args = get_args(field.annotation)
+                field_types[key] = args[0] if args else field.annotation
+            decorators = schema.__pydantic_decorators__
+            plain = (all(field_type in cls._plain_types for field_type in field_types.values())
+                     and not any(field.metadata for field in schema.model_fields.values())
+                     and not (decorators.validators or decorators.field_validators
+                              or decorators.root_validators or decorators.model_validators))
+            plan = (field_types, plain)
+            cls._schema_plans[schema] = plan
+        return plan
+
+    @classmethod
+    async def valid_schema(cls, schema: BaseModel.model_json_schema, **kwargs) -> dict:
+        if not kwargs:
+            return {}
+
+        field_types, plain = cls.compile_schema(schema)
         for key, val in kwargs.items():
-            if key not in schema.model_fields.keys():
+            if key not in field_types:
                 logging.error(f"{schema} has not filed {key}")
                 raise KeyError(f"{schema} has not filed {key}")
 
-            if type(val) != get_args(schema.model_fields[key].annotation)[0]:
+            if type(val) != field_types[key]:
                 logging.error(f"{schema} {key=} has invalid type {type(val)}")
                 raise ValueError(f"{schema} {key=} has invalid type {type(val)}")
 
-        if kwargs:
-            return schema(**kwargs).model_dump(exclude_none=True, exclude_unset=True)
-        else:
-            return {}
+        if plain:
+            return dict(kwargs)
+        return schema(**kwargs).model_dump(exclude_none=True, exclude_unset=True)
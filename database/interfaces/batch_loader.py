@@ -0,0 +1,100 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+class BatchLoader:
+    def __init__(self,
+                 delay: float = 0.0,
+                 max_batch_size: int = 100,
+                 fields: Optional[list[str]] = None):
+        if delay < 0 or max_batch_size <= 0:
+            raise ValueError("delay must be non-negative and max_batch_size greater than 0")
+
+        self.delay = delay
+        self.max_batch_size = max_batch_size
+        self.fields = fields
+        self.__batches: dict[Hashable, list] = {}
+        self.__tasks: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return sum(len(batch[1]) for batch in self.__batches.values())
+
+    @staticmethod
+    def __retrieve(future: asyncio.Future):
+        if not future.cancelled():
+            future.exception()
+
+    def __future(self, futures: dict[Hashable, asyncio.Future], key: Hashable) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(self.__retrieve)
+        futures[key] = future
+        return future
+
+    async def load(self,
+                   group: Hashable,
+                   key: Hashable,
+                   func: Callable[[list[Any]], Awaitable[dict[Any, Any]]]) -> Any:
+        batch = self.__batches.get(group)
+        if batch is None:
+            return await self.__lead(group, key, func)
+
+        batch[2] += 1
+        futures = batch[1]
+        future = futures.get(key)
+        if future is None:
+            future = self.__future(futures, key)
+            if len(futures) >= self.max_batch_size:
+                self.__dispatch(group, batch)
+        return await asyncio.shield(future)
+
+    async def __lead(self,
+                     group: Hashable,
+                     key: Hashable,
+                     func: Callable[[list[Any]], Awaitable[dict[Any, Any]]]) -> Any:
+        batch = [func, {}, 1]
+        self.__batches[group] = batch
+        future = self.__future(batch[1], key)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            if batch[2] == 1 and self.__batches.get(group) is batch:
+                del self.__batches[group]
+                future.cancel()
+            self.__dispatch(group, batch)
+            raise
+
+        if batch[2] == 1 and self.__batches.get(group) is batch:
+            del self.__batches[group]
+            future.cancel()
+            return (await func([key])).get(key)
+
+        self.__dispatch(group, batch)
+        return await asyncio.shield(future)
+
+    def __dispatch(self, group: Hashable, batch: list):
+        if self.__batches.get(group) is not batch:
+            return
+        del self.__batches[group]
+
+        task = asyncio.get_running_loop().create_task(self.__run(batch[0], batch[1]))
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
+
+    @staticmethod
+    async def __run(func: Callable[[list[Any]], Awaitable[dict[Any, Any]]],
+                    futures: dict[Hashable, asyncio.Future]):
+        try:
+            res = await func(list(futures))
+        except asyncio.CancelledError:
+            for future in futures.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for key, future in futures.items():
+            if not future.done():
+                future.set_result(res.get(key))
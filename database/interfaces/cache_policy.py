@@ -0,0 +1,22 @@
+from typing import Optional
+
+
+class CachePolicy:
+    def __init__(self,
+                 ttl: Optional[int] = 3600,
+                 sliding: bool = False,
+                 max_entries: Optional[int] = None):
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be greater than 0")
+        if max_entries is not None and max_entries <= 0:
+            raise ValueError("max_entries must be greater than 0")
+        if sliding and ttl is None:
+            raise ValueError("sliding expiry requires ttl")
+
+        self.ttl = ttl
+        self.sliding = sliding
+        self.max_entries = max_entries
+
+    @property
+    def tracks_access(self) -> bool:
+        return self.sliding or self.max_entries is not None
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import logging
+from types import SimpleNamespace
+from typing import Any, Optional
+from uuid import uuid4
+
+from aredis_om import get_redis_connection
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+
+from config import settings
+from .local_cache import LocalCache
+from .memory import BaseMemoryInterface
+
+
+class InvalidationBus:
+    def __init__(self,
+                 redis: Any = None,
+                 channel: str = "db_cache:invalidate",
+                 reconnect_delay: float = 0.1,
+                 max_reconnect_delay: float = 5.0):
+        if reconnect_delay <= 0 or max_reconnect_delay < reconnect_delay:
+            raise ValueError("reconnect_delay must be greater than 0 and not exceed max_reconnect_delay")
+
+        self._redis = redis if redis is not None else get_redis_connection(url=settings.REDIS_URL)
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.source = uuid4().hex
+        self.__caches: dict[str, list[LocalCache | BaseMemoryInterface]] = {}
+        self.__pubsub = None
+        self.__listener: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self.__listener is not None and not self.__listener.done()
+
+    def subscribe(self, model: str, cache: LocalCache | BaseMemoryInterface):
+        caches = self.__caches.setdefault(model, [])
+        if not any(item is cache for item in caches):
+            caches.append(cache)
+
+    async def publish(self, model: str, ids: list[Any], rows: Optional[list[dict]] = None):
+        if not ids and not rows:
+            return
+        message = {"s": self.source, "m": model, "i": ids}
+        if rows:
+            message["r"] = rows
+        await self._redis.publish(self.channel, json.dumps(message, separators=(",", ":"), default=str))
+
+    def handle(self, data: str | bytes):
+        message = json.loads(data)
+        if message.get("s") == self.source:
+            return
+
+        rows = [SimpleNamespace(**row) for row in message.get("r", ())]
+        for cache in self.__caches.get(message.get("m"), ()):
+            if message.get("i"):
+                cache.invalidate(message["i"])
+            if rows:
+                cache.invalidate_not_found(rows)
+
+    async def start(self):
+        if self.running:
+            return
+        await self.__subscribe()
+        self.__listener = asyncio.create_task(self.__listen())
+
+    async def __subscribe(self):
+        self.__pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        await self.__pubsub.subscribe(self.channel)
+
+    async def __resubscribe(self):
+        try:
+            await self.__pubsub.aclose()
+        except Exception as e:
+            logging.error(e)
+        await self.__subscribe()
+
+        for caches in self.__caches.values():
+            for cache in caches:
+                cache.clear()
+
+    async def __listen(self):
+        delay = self.reconnect_delay
+        while True:
+            try:
+                async for message in self.__pubsub.listen():
+                    delay = self.reconnect_delay
+                    if message is None or message.get("type") != "message":
+                        continue
+                    try:
+                        self.handle(message["data"])
+                    except Exception as e:
+                        logging.error(e)
+            except (RedisConnectionError, RedisTimeoutError, OSError) as e:
+                logging.error(e)
+
+            while True:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+                try:
+                    await self.__resubscribe()
+                    break
+                except (RedisConnectionError, RedisTimeoutError, OSError) as e:
+                    logging.error(e)
+
+    async def close(self):
+        if self.__listener is not None:
+            self.__listener.cancel()
+            try:
+                await self.__listener
+            except asyncio.CancelledError:
+                pass
+            self.__listener = None
+
+        if self.__pubsub is not None:
+            await self.__pubsub.unsubscribe(self.channel)
+            await self.__pubsub.aclose()
+            self.__pubsub = None
@@ -0,0 +1,99 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+NOT_FOUND = object()
+
+
+class LocalCache:
+    def __init__(self,
+                 max_size: int = 1000,
+                 ttl: Optional[float] = 60,
+                 negative_ttl: Optional[float] = None):
+        if max_size <= 0:
+            raise ValueError("max_size must be greater than 0")
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.__items: OrderedDict[Hashable, tuple[Optional[float], Any]] = OrderedDict()
+        self.__keys_by_id: dict[Any, set[Hashable]] = {}
+        self.__not_found_keys: set[Hashable] = set()
+
+    def __len__(self) -> int:
+        return len(self.__items)
+
+    @staticmethod
+    def make_key(**kwargs) -> Optional[Hashable]:
+        key = tuple(sorted(kwargs.items()))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def __remove(self, key: Hashable):
+        _, value = self.__items.pop(key)
+        if value is NOT_FOUND:
+            self.__not_found_keys.discard(key)
+            return
+
+        keys = self.__keys_by_id.get(value.id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.__keys_by_id[value.id]
+
+    def get(self, key: Hashable) -> Any:
+        item = self.__items.get(key)
+        if item is None:
+            return None
+
+        expire_at, value = item
+        if expire_at is not None and expire_at <= time.monotonic():
+            self.__remove(key)
+            return None
+
+        self.__items.move_to_end(key)
+        return value
+
+    def __put(self, key: Hashable, value: Any, ttl: Optional[float]):
+        if key in self.__items:
+            self.__remove(key)
+
+        expire_at = time.monotonic() + ttl if ttl else None
+        self.__items[key] = (expire_at, value)
+
+        while len(self.__items) > self.max_size:
+            self.__remove(next(iter(self.__items)))
+
+    def set(self, key: Hashable, value: Any):
+        self.__put(key, value, self.ttl)
+        self.__keys_by_id.setdefault(value.id, set()).add(key)
+
+    def set_not_found(self, key: Hashable):
+        if not self.negative_ttl:
+            return
+        self.__put(key, NOT_FOUND, self.negative_ttl)
+        self.__not_found_keys.add(key)
+
+    def invalidate(self, ids: list[Any]):
+        for object_id in ids:
+            for key in self.__keys_by_id.pop(object_id, ()):
+                self.__items.pop(key, None)
+
+    def invalidate_not_found(self, objects: list[Any]):
+        for key in list(self.__not_found_keys):
+            for obj in objects:
+                if all(getattr(obj, field, value) == value for field, value in key):
+                    self.__remove(key)
+                    break
+
+    def clear_not_found(self):
+        for key in list(self.__not_found_keys):
+            self.__remove(key)
+
+    def clear(self):
+        self.__items.clear()
+        self.__keys_by_id.clear()
+        self.__not_found_keys.clear()
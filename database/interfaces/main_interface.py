@@ -1,13 +1,25 @@
-import asyncio
-from typing import Union, Any, Optional
+import copy
+import logging
+from contextlib import nullcontext
+from functools import partial
+from typing import Union, Any, AsyncIterator, Optional
 
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 
-from .base_interface import BaseDBInterface
+from .base_interface import BaseDBInterface, BaseCacheInterface, SchemasValidator
+from .batch_loader import BatchLoader
+from .cache_policy import CachePolicy
+from .invalidation import InvalidationBus
+from .local_cache import LocalCache, NOT_FOUND
+from .memory import BaseMemoryInterface
+from .metrics import Metrics
 from .redis_json import BaseRedisInterface
+from .serializers import BlobSerializer
+from .single_flight import SingleFlight
 from .sql import BaseSQLInterface
+from .write_behind import WriteBehindQueue
 
 
 class MainCRUDInterface(BaseDBInterface):
@@ -16,61 +28,208 @@ class MainCRUDInterface(BaseDBInterface):
     _create_schemas = None
     _update_schemas = None
     _filters_schemas = None
+    _batch_size = 1000
+    _batch_field_plans: dict[Any, frozenset] = {}
 
     def __init__(self, db_model: Union[DeclarativeBase, Any],
                  base_schemas: Union[BaseModel, Any],
                  create_schemas: Union[BaseModel, Any],
                  update_schemas: Union[BaseModel, Any],
-                 filters_schemas: Union[BaseModel, Any]):
+                 filters_schemas: Union[BaseModel, Any],
+                 local_cache: Optional[LocalCache] = None,
+                 single_flight: Optional[SingleFlight] = None,
+                 cache_writer: Optional[WriteBehindQueue] = None,
+                 trust_db_rows: bool = False,
+                 cache_policy: Optional[CachePolicy] = None,
+                 invalidation_bus: Optional[InvalidationBus] = None,
+                 metrics: Optional[Metrics] = None,
+                 cache_backend: Optional[BaseCacheInterface] = None,
+                 serializer: Optional[BlobSerializer] = None,
+                 batch_loader: Optional[BatchLoader] = None,
+                 complete_cache: bool = False):
         self._db_model = db_model
         self._base_schemas = base_schemas
         self._create_schemas = create_schemas
         self.update_schemas = update_schemas
         self._filters_schemas = filters_schemas
+        self._local_cache = local_cache
+        self._single_flight = single_flight
+        self._cache_writer = cache_writer
+        self._trust_db_rows = trust_db_rows
+        self._cache_policy = cache_policy
+        self._invalidation_bus = invalidation_bus
+        self._metrics = metrics
+        self._cache_backend = cache_backend
+        self._serializer = serializer
+        self._batch_loader = batch_loader
+        self._complete_cache = complete_cache
+        self.__cache = None
+        self.__sql = None
 
     @property
     def sql(self):
         return self.__sql
 
+    @property
+    def cache(self):
+        return self.__cache
+
     @property
     def redis(self):
-        return self.__redis
+        return self.__cache
 
     async def __migrate(self):
-        await self.__redis.migrate()
+        await self.__cache.migrate()
+
+    def prepare(self) -> "MainCRUDInterface":
+        if self.__cache is None:
+            if self._cache_backend is not None:
+                self.__cache = self._cache_backend
+            else:
+                self.__cache = BaseRedisInterface(self._base_schemas,
+                                                  self._filters_schemas,
+                                                  cache_policy=self._cache_policy,
+                                                  serializer=self._serializer)
+            if self._cache_writer is not None:
+                self._cache_writer.bind(self.__cache.create)
+            if self._invalidation_bus is not None:
+                if self._local_cache is not None:
+                    self._invalidation_bus.subscribe(self._db_model.__tablename__, self._local_cache)
+                if isinstance(self.__cache, BaseMemoryInterface):
+                    self._invalidation_bus.subscribe(self._db_model.__tablename__, self.__cache)
+            if self._metrics is not None:
+                self.__register_gauges()
+        return self
+
+    def __register_gauges(self):
+        model = self._db_model.__tablename__
+        if self._local_cache is not None:
+            self._metrics.gauge("local_cache_size", lambda: len(self._local_cache), model=model)
+        if self._cache_writer is not None:
+            self._metrics.gauge("cache_write_queue_depth", lambda: len(self._cache_writer), model=model)
+            self._metrics.gauge("cache_write_in_flight", lambda: self._cache_writer.in_flight, model=model)
+
+    def __timer(self, backend: str, operation: str):
+        if self._metrics is None:
+            return nullcontext()
+        return self._metrics.timer("backend_latency_seconds",
+                                   model=self._db_model.__tablename__,
+                                   backend=backend,
+                                   operation=operation)
+
+    def __count(self, name: str, value: float = 1, **labels):
+        if self._metrics is not None:
+            self._metrics.inc(name, value, model=self._db_model.__tablename__, **labels)
+
+    def __sql_interface(self, session: AsyncSession) -> BaseSQLInterface:
+        return BaseSQLInterface(session,
+                                self._db_model,
+                                self._base_schemas,
+                                self._create_schemas,
+                                self.update_schemas,
+                                self._filters_schemas,
+                                trust_db_rows=self._trust_db_rows)
+
+    def bind(self, session: AsyncSession) -> "MainCRUDInterface":
+        self.prepare()
+        interface = copy.copy(self)
+        interface.session = session
+        interface.__sql = self.__sql_interface(session)
+        return interface
 
     async def _connect(self, session: AsyncSession):
+        self.prepare()
         self.session = session
-        self.__redis = BaseRedisInterface(self._base_schemas,
-                                          self._filters_schemas)
-        self.__sql = BaseSQLInterface(self.session,
-                                      self._db_model,
-                                      self._base_schemas,
-                                      self._create_schemas,
-                                      self.update_schemas,
-                                      self._filters_schemas)
+        self.__sql = self.__sql_interface(session)
         await self.__migrate()
 
+    async def __fill_cache(self, fill_object: _base_schemas | list[_base_schemas]):
+        self.__count("cache_fills_total", len(fill_object) if isinstance(fill_object, list) else 1)
+        if self._cache_writer is not None:
+            await self._cache_writer.put(fill_object)
+        else:
+            try:
+                await self.__cache.create(fill_object)
+            except Exception as e:
+                logging.error(e)
+
+    async def __discard_fills(self, ids: list[Any]):
+        if self._cache_writer is not None and ids:
+            await self._cache_writer.discard(ids)
+
+    async def __publish(self, ids: list[Any], objects: Optional[list[Any]] = None):
+        if self._invalidation_bus is None:
+            return
+        rows = None
+        if objects:
+            fields = self._filters_schemas.model_fields
+            rows = [{field: getattr(obj, field) for field in fields if hasattr(obj, field)} for obj in objects]
+        await self._invalidation_bus.publish(self._db_model.__tablename__, ids, rows=rows)
+
+    async def __get_one_or_none(self,
+                                where_filter_sql: Any = None,
+                                where_filter_redis: Any = None,
+                                lookup_key: Any = None,
+                                **kwargs
+                                ) -> Optional[_base_schemas]:
+        with self.__timer(self.__cache.backend_name, "get_one_or_none"):
+            res = await self.__cache.get_one_or_none(where_filter=where_filter_redis,
+                                                     **kwargs)
+        if res is None:
+            self.__count("cache_misses_total", tier=self.__cache.backend_name, operation="get_one_or_none")
+            with self.__timer("sql", "get_one_or_none"):
+                res = await self.__sql.get_one_or_none(where_filter=where_filter_sql,
+                                                       **kwargs)
+            if res is not None:
+                await self.__fill_cache(res)
+        else:
+            self.__count("cache_hits_total", tier=self.__cache.backend_name, operation="get_one_or_none")
+
+        if lookup_key is not None and self._local_cache is not None:
+            if res is not None:
+                self._local_cache.set(lookup_key, res.model_copy())
+            else:
+                self._local_cache.set_not_found(lookup_key)
+
+        return res
+
     async def get_one_or_none(self,
                               where_filter_sql: Any = None,
                               where_filter_redis: Any = None,
                               **kwargs
                               ) -> Optional[_base_schemas]:
-        res = None
+        lookup_key = None
+        if where_filter_sql is None and where_filter_redis is None and kwargs:
+            lookup_key = LocalCache.make_key(**kwargs)
 
-        if where_filter_redis is not None or kwargs is not None:
-            res = await self.__redis.get_one_or_none(where_filter=where_filter_redis,
-                                                     **kwargs)
-            if res:
-                return res
+        if lookup_key is not None and self._local_cache is not None:
+            res = self._local_cache.get(lookup_key)
+            if res is None:
+                self.__count("cache_misses_total", tier="local", operation="get_one_or_none")
+            else:
+                self.__count("cache_hits_total", tier="local", operation="get_one_or_none")
+                return res.model_copy() if res is not NOT_FOUND else None
 
-        if res is None and (where_filter_redis is not None or kwargs is not None):
-            res = await self.__sql.get_one_or_none(where_filter=where_filter_sql,
-                                                   **kwargs)
-            if res:
-                asyncio.create_task(self.__redis.create(res))
+        if lookup_key is not None and self._batch_loader is not None and len(kwargs) == 1:
+            field, value = next(iter(kwargs.items()))
+            if field in self.__batch_fields():
+                await SchemasValidator.valid_schema(self._filters_schemas, **kwargs)
+                res = await self._batch_loader.load((self.__sql, field),
+                                                    value,
+                                                    partial(self.__load_batch, field))
+                return res.model_copy() if res is not None else None
 
-        return res
+        if lookup_key is not None and self._single_flight is not None:
+            res = await self._single_flight.do(
+                (self._db_model, lookup_key),
+                lambda: self.__get_one_or_none(lookup_key=lookup_key, **kwargs)
+            )
+            return res.model_copy() if res is not None else None
+
+        return await self.__get_one_or_none(where_filter_sql=where_filter_sql,
+                                            where_filter_redis=where_filter_redis,
+                                            lookup_key=lookup_key,
+                                            **kwargs)
 
     async def get_all(self,
                       where_filter_sql: Any = None,
@@ -78,76 +237,194 @@ class MainCRUDInterface(BaseDBInterface):
                       no_limit: bool = False,
                       limit: int = 10,
                       offset: int = 0,
+                      columns: Optional[list[str]] = None,
                       **kwargs
                       ) -> list[_base_schemas]:
         if limit > 10000 and no_limit == False:
             raise ValueError("limit must be less than 10000")
 
-        res = []
+        if no_limit or columns is not None:
+            with self.__timer("sql", "get_all"):
+                return await self.__sql.get_all(where_filter=where_filter_sql,
+                                                limit=limit,
+                                                offset=offset,
+                                                no_limit=no_limit,
+                                                columns=columns,
+                                                **kwargs)
 
-        if (where_filter_redis is not None or kwargs is not None) and no_limit == False:
-            redis_res = await self.__redis.get_all(where_filter=where_filter_redis,
-                                                   limit=limit,
-                                                   offset=offset,
-                                                   **kwargs)
-            if len(redis_res) >= limit:
-                return redis_res[:limit + 1]
-            else:
-                res += redis_res
+        if self._complete_cache:
+            with self.__timer(self.__cache.backend_name, "get_all"):
+                return await self.__cache.get_all(where_filter=where_filter_redis,
+                                                  limit=limit,
+                                                  offset=offset,
+                                                  **kwargs)
 
-        all_res_id = [item.id for item in res]
-        while True:
-            if where_filter_sql is not None:
-                where_filter_sql = where_filter_sql & (self._db_model.id.not_in(all_res_id))
-            else:
-                where_filter_sql = self._db_model.id.not_in(all_res_id)
-            sql_res = await self.__sql.get_all(where_filter=where_filter_sql,
-                                               limit=limit,
-                                               offset=offset,
-                                               no_limit=no_limit,
-                                               **kwargs)
+        with self.__timer("sql", "get_ids"):
+            page_ids = await self.__sql.get_ids(where_filter=where_filter_sql,
+                                                limit=limit,
+                                                offset=offset,
+                                                **kwargs)
+        if not page_ids:
+            return []
+
+        with self.__timer(self.__cache.backend_name, "get_by_ids"):
+            res = await self.__cache.get_by_ids(page_ids)
+
+        missing_ids = [item_id for item_id in page_ids if item_id not in res]
+        if missing_ids:
+            self.__count("cache_misses_total", tier=self.__cache.backend_name, operation="get_all")
+            self.__count("get_all_fallback_total", stage="sql")
+            with self.__timer("sql", "get_all"):
+                sql_res = await self.__sql.get_all(where_filter=self._db_model.id.in_(missing_ids),
+                                                   no_limit=True)
+            if sql_res:
+                await self.__fill_cache(sql_res)
+            res.update({item.id: item for item in sql_res})
+        else:
+            self.__count("cache_hits_total", tier=self.__cache.backend_name, operation="get_all")
+
+        return [res[item_id] for item_id in page_ids if item_id in res]
+
+    async def __get_many(self, values: list[Any], field: str = "id") -> dict[Any, _base_schemas]:
+        res = {}
+        if self._local_cache is not None:
+            for value in values:
+                item = self._local_cache.get(LocalCache.make_key(**{field: value}))
+                if item is not None and item is not NOT_FOUND:
+                    res[value] = item.model_copy()
+            self.__count("cache_hits_total", len(res), tier="local", operation="get_many")
+            self.__count("cache_misses_total", len(values) - len(res), tier="local", operation="get_many")
 
-            if no_limit:
-                return sql_res
+        lookup_values = [value for value in values if value not in res]
+        if not lookup_values:
+            return res
 
-            if not sql_res:
-                break
+        with self.__timer(self.__cache.backend_name, "get_by_values"):
+            cache_res = await self.__cache.get_by_values(field, lookup_values)
+        self.__count("cache_hits_total", len(cache_res), tier=self.__cache.backend_name, operation="get_many")
+        self.__count("cache_misses_total", len(lookup_values) - len(cache_res),
+                     tier=self.__cache.backend_name, operation="get_many")
+        res.update(cache_res)
 
-            asyncio.create_task(self.__redis.create(sql_res))
-            all_res_id += [item.id for item in sql_res]
-            res += sql_res
-            if len(set(all_res_id)) >= limit:
-                return res[:limit + 1]
+        missing_values = [value for value in lookup_values if value not in cache_res]
+        column = getattr(self._db_model, field)
+        sql_res = []
+        for start in range(0, len(missing_values), self._batch_size):
+            with self.__timer("sql", "get_many"):
+                sql_res += await self.__sql.get_all(
+                    where_filter=column.in_(missing_values[start:start + self._batch_size]),
+                    no_limit=True
+                )
+        if sql_res:
+            await self.__fill_cache(sql_res)
+            for item in sql_res:
+                res.setdefault(getattr(item, field), item)
 
-            offset += limit
-            limit -= len(res)
+        if self._local_cache is not None:
+            for value in lookup_values:
+                if value in res:
+                    self._local_cache.set(LocalCache.make_key(**{field: value}), res[value].model_copy())
+        return res
+
+    async def get_many(self, ids: list[Any]) -> list[_base_schemas]:
+        if not ids:
+            return []
+
+        res = await self.__get_many(list(dict.fromkeys(ids)))
+        return [res[item_id] for item_id in ids if item_id in res]
 
+    async def __load_batch(self, field: str, values: list[Any]) -> dict[Any, _base_schemas]:
+        self.__count("batch_loads_total", field=field)
+        self.__count("batch_load_keys_total", len(values), field=field)
+        res = await self.__get_many(values, field=field)
+        if self._local_cache is not None:
+            for value in values:
+                if value not in res:
+                    self._local_cache.set_not_found(LocalCache.make_key(**{field: value}))
         return res
 
+    def __batch_fields(self) -> frozenset:
+        if self._batch_loader.fields is not None:
+            return frozenset(self._batch_loader.fields)
+
+        fields = self._batch_field_plans.get(self._db_model)
+        if fields is None:
+            fields = frozenset(column.key for column in self._db_model.__table__.columns
+                               if (column.primary_key or column.unique)
+                               and column.key in self._filters_schemas.model_fields
+                               and column.key in self._base_schemas.model_fields)
+            self._batch_field_plans[self._db_model] = fields
+        return fields
+
+    async def iter_all(self,
+                       where_filter_sql: Any = None,
+                       chunk_size: int = 1000,
+                       columns: Optional[list[str]] = None,
+                       **kwargs) -> AsyncIterator[list[_base_schemas]]:
+        async for chunk in self.__sql.iter_all(where_filter=where_filter_sql,
+                                               chunk_size=chunk_size,
+                                               columns=columns,
+                                               **kwargs):
+            yield chunk
+
     async def create(self,
-                     create_object: _create_schemas | list[_create_schemas]) -> bool:
-        return await self.__sql.create(create_object)
+                     create_object: _create_schemas | list[_create_schemas],
+                     write_through: bool = False) -> Any:
+        if not write_through:
+            res = await self.__sql.create(create_object)
+            created = create_object if isinstance(create_object, list) else [create_object]
+            if self._local_cache is not None:
+                self._local_cache.invalidate_not_found(created)
+            await self.__publish([], created)
+            return res
+
+        res = await self.__sql.create(create_object, returning=True)
+        created = res if isinstance(res, list) else [res]
+        await self.__discard_fills([item.id for item in created])
+        await self.__cache.create(created)
+        if self._local_cache is not None:
+            self._local_cache.invalidate_not_found(created)
+        await self.__publish([item.id for item in created], created)
+        return res
+
+    async def upsert_many(self,
+                          upsert_object: list[_create_schemas],
+                          conflict_columns: list[str]) -> list[_base_schemas]:
+        res = await self.__sql.upsert_many(upsert_object, conflict_columns)
+        await self.__discard_fills([item.id for item in res])
+        await self.__cache.create(res)
+        if self._local_cache is not None:
+            self._local_cache.invalidate([item.id for item in res])
+            self._local_cache.invalidate_not_found(res)
+        await self.__publish([item.id for item in res], res)
+        return res
 
     async def update(self,
                      update_object: dict,
                      where_filter_sql: Any = None,
                      **kwargs) -> bool:
-        await self.__sql.update(update_object, where_filter_sql, **kwargs)
-        obj = await self.__sql.get_all(where_filter_sql, **kwargs)
-        await self.__redis.update(obj)
+        obj = await self.__sql.update(update_object, where_filter_sql, returning=True, **kwargs)
+        if self._local_cache is not None:
+            self._local_cache.invalidate([item.id for item in obj])
+            self._local_cache.invalidate_not_found(obj)
+        await self.__discard_fills([item.id for item in obj])
+        await self.__cache.update(obj)
+        await self.__publish([item.id for item in obj], obj)
         return True
 
     async def delete(self,
                      where_filter: Any = None,
                      soft: bool = True,
                      **kwargs) -> bool:
-        res = await self.__sql.get_all(where_filter, **kwargs)
-        for item in res:
-            await self.__redis.delete(self._base_schemas.id == item.id)
         if soft:
-            await self.__sql.soft_delete(where_filter, **kwargs)
+            ids = await self.__sql.soft_delete(where_filter, returning=True, **kwargs)
         else:
-            await self.__sql.delete(where_filter, **kwargs)
+            ids = await self.__sql.delete(where_filter, returning=True, **kwargs)
+        if self._local_cache is not None:
+            self._local_cache.invalidate(ids)
+        await self.__discard_fills(ids)
+        await self.__cache.delete_by_ids(ids)
+        await self.__publish(ids)
         return True
 
     async def uniq_col_value(self, col_name: str) -> list[Any]:
@@ -0,0 +1,277 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, Optional
+
+from aredis_om.model.model import Expression, NegatedExpression, Operators
+from pydantic import BaseModel
+
+from .base_interface import BaseCacheInterface, SchemasValidator
+from .cache_policy import CachePolicy
+
+
+class BaseMemoryInterface(BaseCacheInterface, SchemasValidator):
+    _base_schemas = None
+    _filter_schemas = None
+    _sort_field = "id"
+    backend_name = "memory"
+
+    def __init__(self,
+                 base_schemas: BaseModel.model_json_schema,
+                 filter_schemas: BaseModel.model_json_schema,
+                 cache_policy: Optional[CachePolicy] = None,
+                 index_fields: Optional[list[str]] = None,
+                 copy_on_read: bool = True):
+        self._base_schemas = base_schemas
+        self._filter_schemas = filter_schemas
+        self._cache_policy = cache_policy
+        self._copy_on_read = copy_on_read
+
+        if index_fields is None:
+            index_fields = [key for key in filter_schemas.model_fields
+                            if key in base_schemas.model_fields and key != self._sort_field]
+        self.__items: OrderedDict[Any, list] = OrderedDict()
+        self.__indexes: dict[str, dict[Hashable, set[Any]]] = {key: {} for key in index_fields}
+        self.__ordered_ids: Optional[list[Any]] = None
+
+    def __len__(self) -> int:
+        return len(self.__items)
+
+    async def migrate(self):
+        return self
+
+    def clear(self):
+        self.__items.clear()
+        self.__ordered_ids = None
+        for index in self.__indexes.values():
+            index.clear()
+
+    def __index(self, object_id: Any, obj: BaseModel):
+        for key, index in self.__indexes.items():
+            value = getattr(obj, key, None)
+            if value is not None:
+                index.setdefault(value, set()).add(object_id)
+
+    def __unindex(self, object_id: Any, obj: BaseModel):
+        for key, index in self.__indexes.items():
+            value = getattr(obj, key, None)
+            ids = index.get(value)
+            if ids is not None:
+                ids.discard(object_id)
+                if not ids:
+                    del index[value]
+
+    def __remove(self, object_id: Any) -> bool:
+        item = self.__items.pop(object_id, None)
+        if item is None:
+            return False
+        self.__unindex(object_id, item[1])
+        self.__ordered_ids = None
+        return True
+
+    def __expire_at(self) -> Optional[float]:
+        if self._cache_policy is None or self._cache_policy.ttl is None:
+            return None
+        return time.monotonic() + self._cache_policy.ttl
+
+    def __get(self, object_id: Any) -> Optional[BaseModel]:
+        item = self.__items.get(object_id)
+        if item is None:
+            return None
+
+        if item[0] is not None and item[0] <= time.monotonic():
+            self.__remove(object_id)
+            return None
+
+        if self._cache_policy is not None:
+            if self._cache_policy.sliding:
+                item[0] = self.__expire_at()
+            if self._cache_policy.max_entries is not None:
+                self.__items.move_to_end(object_id)
+        return item[1]
+
+    def __output(self, obj: BaseModel) -> BaseModel:
+        return obj.model_copy() if self._copy_on_read else obj
+
+    async def create(self, create_object: _base_schemas | list[_base_schemas]) -> bool:
+        if not isinstance(create_object, list):
+            create_object = [create_object]
+
+        expire_at = self.__expire_at()
+        for item in create_object:
+            item = item.model_copy()
+            if not self.__remove(item.id):
+                self.__ordered_ids = None
+            self.__items[item.id] = [expire_at, item]
+            self.__index(item.id, item)
+
+        if self._cache_policy is not None and self._cache_policy.max_entries is not None:
+            while len(self.__items) > self._cache_policy.max_entries:
+                self.__remove(next(iter(self.__items)))
+        return True
+
+    async def update(self, update_object: _base_schemas | list[_base_schemas]) -> bool:
+        return await self.create(update_object)
+
+    def __candidates(self, filters: dict) -> tuple[Iterable[Any], dict]:
+        if self._sort_field in filters:
+            rest = {key: value for key, value in filters.items() if key != self._sort_field}
+            return (filters[self._sort_field],), rest
+
+        matches = []
+        rest = {}
+        for key, value in filters.items():
+            index = self.__indexes.get(key)
+            if index is not None:
+                matches.append(index.get(value, ()))
+            else:
+                rest[key] = value
+        if not matches:
+            return list(self.__items.keys()), rest
+        if len(matches) == 1:
+            return list(matches[0]), rest
+
+        matches.sort(key=len)
+        res = set(matches[0])
+        for ids in matches[1:]:
+            res &= ids
+        return list(res), rest
+
+    @staticmethod
+    def __like(value: Any, pattern: Any) -> bool:
+        if value is None:
+            return False
+        value = str(value).lower()
+        return all(term.strip("*") in value for term in str(pattern).lower().split())
+
+    def evaluate(self, where_filter: Any, obj: BaseModel) -> bool:
+        if isinstance(where_filter, NegatedExpression):
+            return not self.evaluate(where_filter.expression, obj)
+        if not isinstance(where_filter, Expression):
+            return bool(where_filter(obj))
+
+        op = where_filter.op
+        if op is Operators.AND:
+            return self.evaluate(where_filter.left, obj) and self.evaluate(where_filter.right, obj)
+        if op is Operators.OR:
+            return self.evaluate(where_filter.left, obj) or self.evaluate(where_filter.right, obj)
+
+        value = getattr(obj, where_filter.left.alias, None)
+        other = where_filter.right
+        if isinstance(value, bool) and isinstance(other, (str, int)):
+            other = bool(int(other))
+
+        if op is Operators.EQ:
+            return value == other
+        if op is Operators.NE:
+            return value != other
+        if op is Operators.IN:
+            return value in other
+        if op is Operators.NOT_IN:
+            return value not in other
+        if op in (Operators.LIKE, Operators.CONTAINS):
+            return self.__like(value, other)
+        if op is Operators.STARTSWITH:
+            return value is not None and str(value).startswith(other)
+        if op is Operators.ENDSWITH:
+            return value is not None and str(value).endswith(other)
+        if value is None:
+            return False
+        if op is Operators.LT:
+            return value < other
+        if op is Operators.LE:
+            return value <= other
+        if op is Operators.GT:
+            return value > other
+        if op is Operators.GE:
+            return value >= other
+        raise ValueError(f"Operator {op} is not supported by {self.__class__.__name__}")
+
+    async def __find(self, where_filter: Any = None, **kwargs) -> list[BaseModel]:
+        filters = await self.valid_schema(self._filter_schemas, **kwargs)
+        candidates, rest = self.__candidates(filters)
+
+        res = []
+        for object_id in candidates:
+            obj = self.__get(object_id)
+            if obj is None:
+                continue
+            if rest and any(getattr(obj, key, None) != value for key, value in rest.items()):
+                continue
+            if where_filter is not None and not self.evaluate(where_filter, obj):
+                continue
+            res.append(obj)
+        return res
+
+    async def get_one_or_none(self, where_filter: Any = None, **kwargs) -> Optional[_base_schemas]:
+        if where_filter is None and not kwargs:
+            raise ValueError('At least one of `where_filter` or `kwargs` must be set')
+
+        res = await self.__find(where_filter, **kwargs)
+        if not res:
+            return None
+        if len(res) > 1:
+            res.sort(key=lambda obj: getattr(obj, self._sort_field))
+        return self.__output(res[0])
+
+    async def get_all(self,
+                      where_filter: Any = None,
+                      limit: int = 10,
+                      offset: int = 0,
+                      **kwargs) -> list[_base_schemas]:
+        if where_filter is None and not kwargs:
+            if self.__ordered_ids is None:
+                self.__ordered_ids = sorted(self.__items.keys())
+
+            res = []
+            for object_id in self.__ordered_ids[offset:]:
+                obj = self.__get(object_id)
+                if obj is not None:
+                    res.append(self.__output(obj))
+                    if len(res) >= limit:
+                        break
+            return res
+
+        res = await self.__find(where_filter, **kwargs)
+        res.sort(key=lambda obj: getattr(obj, self._sort_field))
+        return [self.__output(obj) for obj in res[offset:offset + limit]]
+
+    async def get_by_ids(self, ids: list[Any]) -> dict[Any, _base_schemas]:
+        res = {}
+        for object_id in ids:
+            obj = self.__get(object_id)
+            if obj is not None:
+                res[object_id] = self.__output(obj)
+        return res
+
+    async def get_by_values(self, field: str, values: list[Any]) -> dict[Any, _base_schemas]:
+        if field == self._sort_field:
+            return await self.get_by_ids(values)
+
+        res = {}
+        for value in values:
+            obj = await self.get_one_or_none(**{field: value})
+            if obj is not None:
+                res[value] = obj
+        return res
+
+    async def delete_by_ids(self, ids: list[Any]) -> bool:
+        if not ids:
+            return False
+        for object_id in ids:
+            self.__remove(object_id)
+        return True
+
+    def invalidate(self, ids: list[Any]):
+        for object_id in ids:
+            self.__remove(object_id)
+
+    def invalidate_not_found(self, objects: list[Any]):
+        return
+
+    async def delete(self, where_filter: Any) -> bool:
+        res = await self.__find(where_filter)
+        if not res:
+            return False
+        for obj in res:
+            self.__remove(obj.id)
+        return True
@@ -0,0 +1,120 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Metrics:
+    _buckets = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+    def __init__(self,
+                 namespace: str = "db",
+                 buckets: Optional[tuple[float, ...]] = None,
+                 callback: Optional[Callable[[str, float, dict[str, str]], Any]] = None):
+        self.namespace = namespace
+        self.buckets = tuple(sorted(buckets)) if buckets else self._buckets
+        self._callback = callback
+        self.__counters: dict[str, dict[Labels, float]] = {}
+        self.__histograms: dict[str, dict[Labels, list[float]]] = {}
+        self.__gauges: dict[str, dict[Labels, Callable[[], float]]] = {}
+
+    @staticmethod
+    def __labels(labels: dict[str, Any]) -> Labels:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels):
+        series = self.__counters.setdefault(name, {})
+        key = self.__labels(labels)
+        series[key] = series.get(key, 0) + value
+        if self._callback is not None:
+            self._callback(name, value, labels)
+
+    def observe(self, name: str, value: float, **labels):
+        series = self.__histograms.setdefault(name, {})
+        key = self.__labels(labels)
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = [0] * (len(self.buckets) + 2)
+
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            histogram[index] += 1
+        histogram[-2] += value
+        histogram[-1] += 1
+        if self._callback is not None:
+            self._callback(name, value, labels)
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def gauge(self, name: str, func: Callable[[], float], **labels):
+        self.__gauges.setdefault(name, {})[self.__labels(labels)] = func
+
+    def counter(self, name: str, **labels) -> float:
+        return self.__counters.get(name, {}).get(self.__labels(labels), 0)
+
+    def histogram(self, name: str, **labels) -> tuple[int, float]:
+        histogram = self.__histograms.get(name, {}).get(self.__labels(labels))
+        if histogram is None:
+            return 0, 0.0
+        return histogram[-1], histogram[-2]
+
+    def value(self, name: str, **labels) -> Optional[float]:
+        func = self.__gauges.get(name, {}).get(self.__labels(labels))
+        return func() if func is not None else None
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "counters": {name: dict(series) for name, series in self.__counters.items()},
+            "histograms": {name: {labels: (values[-1], values[-2]) for labels, values in series.items()}
+                           for name, series in self.__histograms.items()},
+            "gauges": {name: {labels: func() for labels, func in series.items()}
+                       for name, series in self.__gauges.items()},
+        }
+
+    def reset(self):
+        self.__counters.clear()
+        self.__histograms.clear()
+
+    @staticmethod
+    def __format_labels(labels: Labels, extra: Labels = ()) -> str:
+        labels = labels + extra
+        if not labels:
+            return ""
+        values = ",".join('%s="%s"' % (key, value.replace("\\", "\\\\").replace('"', '\\"'))
+                          for key, value in labels)
+        return "{%s}" % values
+
+    def export_prometheus(self) -> str:
+        lines = []
+        for name, series in self.__counters.items():
+            metric = f"{self.namespace}_{name}"
+            lines.append(f"# TYPE {metric} counter")
+            for labels, value in series.items():
+                lines.append(f"{metric}{self.__format_labels(labels)} {value}")
+
+        for name, series in self.__gauges.items():
+            metric = f"{self.namespace}_{name}"
+            lines.append(f"# TYPE {metric} gauge")
+            for labels, func in series.items():
+                lines.append(f"{metric}{self.__format_labels(labels)} {func()}")
+
+        for name, series in self.__histograms.items():
+            metric = f"{self.namespace}_{name}"
+            lines.append(f"# TYPE {metric} histogram")
+            for labels, values in series.items():
+                total = 0
+                for bucket, count in zip(self.buckets, values):
+                    total += count
+                    lines.append(f"{metric}_bucket{self.__format_labels(labels, (('le', str(bucket)),))} {total}")
+                lines.append(f"{metric}_bucket{self.__format_labels(labels, (('le', '+Inf'),))} {values[-1]}")
+                lines.append(f"{metric}_sum{self.__format_labels(labels)} {values[-2]}")
+                lines.append(f"{metric}_count{self.__format_labels(labels)} {values[-1]}")
+        return "\n".join(lines) + "\n"
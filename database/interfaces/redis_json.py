@@ -1,12 +1,20 @@
+import logging
+import operator
+import time
 import warnings
 from abc import ABC
-from typing import Any, Optional, Union
+from functools import reduce
+from typing import Any, Optional, Union, get_args
 
 from aredis_om import NotFoundError, get_redis_connection, HashModel, Migrator
+from aredis_om.model.model import FieldInfo
 from pydantic import BaseModel
+from redis.asyncio import Redis
 
 from config import settings
-from .base_interface import BaseDBInterface, SchemasValidator
+from .base_interface import BaseCacheInterface, SchemasValidator
+from .cache_policy import CachePolicy
+from .serializers import BlobSerializer
 
 
 class BaseRedisModel(HashModel, ABC):
@@ -15,13 +23,21 @@ class BaseRedisModel(HashModel, ABC):
         database = get_redis_connection(url=settings.REDIS_URL)
 
 
-class BaseRedisInterface(BaseDBInterface, SchemasValidator):
+class BaseRedisInterface(BaseCacheInterface, SchemasValidator):
+    backend_name = "redis"
     _base_schemas = None
     _filter_schemas = None
+    _batch_size = 1000
+    _sort_field = "id"
+    _bool_fields: dict[Any, tuple[str, ...]] = {}
+    _blob_plans: dict[Any, tuple[frozenset[str], bool]] = {}
+    _binary_clients: dict[int, tuple[Any, Redis]] = {}
 
     def __init__(self,
                  base_schemas: HashModel.model_json_schema,
-                 filter_schemas: BaseModel.model_json_schema
+                 filter_schemas: BaseModel.model_json_schema,
+                 cache_policy: Optional[CachePolicy] = None,
+                 serializer: Optional[BlobSerializer] = None
                  ):
         warnings.filterwarnings(
             "ignore",
@@ -35,42 +51,58 @@ class BaseRedisInterface(BaseDBInterface, SchemasValidator):
 
         self._base_schemas = base_schemas
         self._filter_schemas = filter_schemas
+        self._cache_policy = cache_policy
+        self._serializer = serializer
         self.bool_filed = []
         self.find_bool_filed()
+        if serializer is not None:
+            self.__indexed_fields, self.__trusted_blob = self.compile_blob_plan(self._base_schemas)
+            if self.__indexed_fields.issuperset(self._base_schemas.model_fields):
+                logging.warning(f"{self._base_schemas} has no unindexed fields to serialize, blob mode is skipped")
+                self._serializer = None
 
-    async def __bool_convert(self, val: bool | int):
-        if isinstance(val, bool):
-            return int(val)
-        else:
-            return bool(val)
+    @classmethod
+    def compile_blob_plan(cls, base_schemas: HashModel.model_json_schema) -> tuple[frozenset[str], bool]:
+        plan = cls._blob_plans.get(base_schemas)
+        if plan is None:
+            indexed = {"pk"}
+            for key, field in base_schemas.model_fields.items():
+                if not isinstance(field, FieldInfo) and field.metadata and isinstance(field.metadata[0], FieldInfo):
+                    field = field.metadata[0]
+                if any(getattr(field, attr, None) is True for attr in ("index", "sortable", "full_text_search")):
+                    indexed.add(key)
+            field_types, _ = cls.compile_schema(base_schemas)
+            trusted = all(field_type in (int, float, str, bool) for field_type in field_types.values())
+            plan = (frozenset(indexed), trusted)
+            cls._blob_plans[base_schemas] = plan
+        return plan
 
     def find_bool_filed(self):
-        for key, type_value in self._base_schemas.__annotations__.items():
-            try:
-                if bool in type_value.__args__:
+        bool_filed = self._bool_fields.get(self._base_schemas)
+        if bool_filed is None:
+            bool_filed = tuple(key for key, field in self._base_schemas.model_fields.items()
+                               if field.annotation is bool or bool in get_args(field.annotation))
+            for key in bool_filed:
+                if key in self._base_schemas.__annotations__:
                     self._base_schemas.__annotations__[key] = Union[bool, int]
-                    self.bool_filed.append(key)
-            except:
-                pass
+            self._bool_fields[self._base_schemas] = bool_filed
+        self.bool_filed = list(bool_filed)
 
     async def migrate(self):
         await Migrator().run()
         return self
 
-    async def __bool_convert_for_object(self, val_obj: BaseModel | list[BaseModel]):
-        if isinstance(val_obj, list):
-            res = []
-            for val in val_obj:
-                for key in val.model_dump().keys():
-                    if key in self.bool_filed:
-                        setattr(val, key, await self.__bool_convert(getattr(val, key)))
-                        res.append(val)
-            return res
-        else:
-            for key in val_obj.model_dump().keys():
-                if key in self.bool_filed:
-                    setattr(val_obj, key, await self.__bool_convert(getattr(val_obj, key)))
-            return val_obj
+    def __decode_bool_fields(self, objects: list[BaseModel]) -> list[BaseModel]:
+        if not self.bool_filed:
+            return objects
+
+        for obj in objects:
+            values = obj.__dict__
+            for key in self.bool_filed:
+                value = values.get(key)
+                if value is not None and value.__class__ is not bool:
+                    values[key] = bool(int(value))
+        return objects
 
     async def __connect_filter_with_kwargs(self, where_filter: Any = None,
                                            error: bool = True, **kwargs):
@@ -82,7 +114,7 @@ class BaseRedisInterface(BaseDBInterface, SchemasValidator):
 
         for key, value in kwargs.items():
             if key in self.bool_filed:
-                value = self.__bool_convert(value)
+                value = str(int(value))
 
             model_item = getattr(self._base_schemas, key)
             if not where_filter:
@@ -92,29 +124,138 @@ class BaseRedisInterface(BaseDBInterface, SchemasValidator):
 
         return where_filter
 
-    async def __create(self, create_object: _base_schemas):
-        create_object = await self.__bool_convert_for_object(create_object)
+    def __key(self, object_id: Any) -> str:
+        return self._base_schemas.make_primary_key(object_id)
+
+    def __lru_key(self) -> str:
+        return self._base_schemas.make_key("__lru")
+
+    async def __evict(self, size: int):
+        excess = size - self._cache_policy.max_entries
+        if excess <= 0:
+            return
+
+        db = self._base_schemas.db()
+        evicted = await db.zpopmin(self.__lru_key(), excess)
+        if evicted:
+            await db.unlink(*[key for key, _ in evicted])
+
+    async def __touch(self, objects: list[_base_schemas]):
+        if self._cache_policy is None or not self._cache_policy.tracks_access or not objects:
+            return
+
+        keys = [self.__key(obj.id) for obj in objects]
+        async with self._base_schemas.db().pipeline(transaction=False) as pipeline:
+            if self._cache_policy.sliding:
+                for key in keys:
+                    pipeline.expire(key, self._cache_policy.ttl)
+            if self._cache_policy.max_entries is not None:
+                now = time.time()
+                pipeline.zadd(self.__lru_key(), {key: now for key in keys}, xx=True)
+            await pipeline.execute()
+
+    def __cache_document(self, cache_object: _base_schemas) -> dict:
+        document = cache_object.model_dump(mode="json")
+        document["pk"] = str(cache_object.id)
+        if self._serializer is not None:
+            blob = self._serializer.dumps(document)
+            document = {key: value for key, value in document.items()
+                        if value is not None and key in self.__indexed_fields}
+            document[BlobSerializer.blob_field] = blob
+        else:
+            document = {key: value for key, value in document.items() if value is not None}
+
+        for key in self.bool_filed:
+            if isinstance(document.get(key), bool):
+                document[key] = int(document[key])
+        return document
+
+    def __binary_db(self) -> Redis:
+        db = self._base_schemas.db()
+        client = self._binary_clients.get(id(db))
+        if client is None or client[0] is not db:
+            pool = db.connection_pool
+            kwargs = dict(pool.connection_kwargs, decode_responses=False)
+            client = (db, Redis(connection_pool=pool.__class__(connection_class=pool.connection_class, **kwargs)))
+            self._binary_clients[id(db)] = client
+        return client[1]
+
+    def __from_blob(self, data: Optional[bytes]) -> Optional[_base_schemas]:
+        if not data:
+            return None
         try:
-            await self.delete(self._base_schemas.id == create_object.id)
-        except:
-            pass
-        await create_object.save()
-        return True
+            document = self._serializer.loads(data)
+        except Exception as e:
+            logging.error(e)
+            return None
 
-    async def create(self, create_object: _base_schemas | list[_base_schemas]) -> bool:
-        if isinstance(create_object, list):
-            for item in create_object:
-                await self.__create(item)
+        if self.__trusted_blob:
+            return self._base_schemas.model_construct(**document)
+        return self._base_schemas.model_validate(document)
+
+    async def __fetch_blobs(self, keys: list[str]) -> list[Optional[_base_schemas]]:
+        if not keys:
+            return []
+        async with self.__binary_db().pipeline(transaction=False) as pipeline:
+            for key in keys:
+                pipeline.hget(key, BlobSerializer.blob_field)
+            blobs = await pipeline.execute()
+        return [self.__from_blob(blob) for blob in blobs]
+
+    async def __search_keys(self,
+                            where_filter: Any = None,
+                            offset: int = 0,
+                            limit: int = 10,
+                            sort: bool = True) -> list[str]:
+        if where_filter is not None:
+            query = self._base_schemas.find(where_filter)
         else:
-            await self.__create(create_object)
+            query = self._base_schemas.find()
+        if sort:
+            query = query.sort_by(self._sort_field)
+
+        res = await query.copy(offset=offset, limit=limit, nocontent=True).execute(exhaust_results=False,
+                                                                                   return_raw_result=True)
+        return list(res[1:])
+
+    async def create(self, create_object: _base_schemas | list[_base_schemas]) -> bool:
+        if not isinstance(create_object, list):
+            create_object = [create_object]
+
+        policy = self._cache_policy
+        db = self._base_schemas.db()
+        for start in range(0, len(create_object), self._batch_size):
+            pipeline = db.pipeline(transaction=False)
+            keys = []
+            for item in create_object[start:start + self._batch_size]:
+                key = self.__key(item.id)
+                keys.append(key)
+                pipeline.unlink(key)
+                pipeline.hset(key, mapping=self.__cache_document(item))
+                if policy is not None and policy.ttl is not None:
+                    pipeline.expire(key, policy.ttl)
+            if policy is not None and policy.max_entries is not None:
+                now = time.time()
+                pipeline.zadd(self.__lru_key(), {key: now for key in keys})
+                pipeline.zcard(self.__lru_key())
+            res = await pipeline.execute()
+
+            if policy is not None and policy.max_entries is not None:
+                await self.__evict(res[-1])
         return True
 
     async def get_one_or_none(self, where_filter: Any = None, **kwargs) -> Optional[_base_schemas]:
         try:
             where_filter = await self.__connect_filter_with_kwargs(where_filter, **kwargs)
-            res = await self._base_schemas.find(where_filter).first()
-            res = await self.__bool_convert_for_object(res)
-            return res
+            if self._serializer is not None:
+                res = next((obj for obj in await self.__fetch_blobs(
+                    await self.__search_keys(where_filter, limit=1, sort=False)) if obj is not None), None)
+                if res is None:
+                    return None
+            else:
+                res = await self._base_schemas.find(where_filter).first()
+            await self.__touch([res])
+            return self.__decode_bool_fields([res])[0]
         except NotFoundError:
             return None
 
@@ -128,34 +269,84 @@ class BaseRedisInterface(BaseDBInterface, SchemasValidator):
                                                                    error=False,
                                                                    **kwargs)
 
-            if where_filter:
-                where_filter = where_filter & (
-                        (self._base_schemas.id >= offset) & (self._base_schemas.id <= limit + offset - 1))
+            if self._serializer is not None:
+                res = [obj for obj in await self.__fetch_blobs(
+                    await self.__search_keys(where_filter, offset=offset, limit=limit)) if obj is not None]
+            elif where_filter is not None:
+                res = await self._base_schemas.find(where_filter).sort_by(self._sort_field).page(offset=offset,
+                                                                                                limit=limit)
             else:
-                where_filter = (self._base_schemas.id >= offset) & (self._base_schemas.id < limit + offset - 1)
+                res = await self._base_schemas.find().sort_by(self._sort_field).page(offset=offset, limit=limit)
+            await self.__touch(res)
+            return self.__decode_bool_fields(res)
+        except NotFoundError:
+            return []
 
-            res = await self._base_schemas.find(where_filter).all()
-            res = await self.__bool_convert_for_object(res)
+    async def get_by_ids(self, ids: list[Any]) -> dict[Any, _base_schemas]:
+        res = {}
+        if not ids:
+            return res
 
+        if self._serializer is not None:
+            objects = await self.__fetch_blobs([self.__key(object_id) for object_id in ids])
+            res = {object_id: obj for object_id, obj in zip(ids, objects) if obj is not None}
+            await self.__touch(list(res.values()))
             return res
-        except NotFoundError:
-            return []
 
-    async def __update(self, update_object: _base_schemas):
-        await self.delete(self._base_schemas.id == update_object.id)
-        await self.create(update_object)
-        return True
+        async with self._base_schemas.db().pipeline(transaction=False) as pipeline:
+            for object_id in ids:
+                pipeline.hgetall(self.__key(object_id))
+            documents = await pipeline.execute()
+
+        for object_id, document in zip(ids, documents):
+            if document:
+                res[object_id] = self._base_schemas.model_validate(document)
+        await self.__touch(list(res.values()))
+        self.__decode_bool_fields(list(res.values()))
+        return res
+
+    async def get_by_values(self, field: str, values: list[Any]) -> dict[Any, _base_schemas]:
+        if not values:
+            return {}
+        if field == self._sort_field:
+            return await self.get_by_ids(values)
+
+        column = getattr(self._base_schemas, field)
+        where_filter = reduce(operator.or_, (column == value for value in values))
+        res = await self.get_all(where_filter=where_filter, limit=len(values))
+        return {getattr(obj, field): obj for obj in reversed(res)}
 
     async def update(self, update_object: _base_schemas | list[_base_schemas]) -> bool:
-        if isinstance(update_object, list):
-            for item in update_object:
-                await self.__update(item)
-        else:
-            await self.__update(update_object)
+        return await self.create(update_object)
+
+    async def delete_by_ids(self, ids: list[Any]) -> bool:
+        if not ids:
+            return False
+
+        async with self._base_schemas.db().pipeline(transaction=False) as pipeline:
+            for start in range(0, len(ids), self._batch_size):
+                keys = [self.__key(object_id) for object_id in ids[start:start + self._batch_size]]
+                pipeline.unlink(*keys)
+                if self._cache_policy is not None and self._cache_policy.max_entries is not None:
+                    pipeline.zrem(self.__lru_key(), *keys)
+            await pipeline.execute()
+        return True
 
     async def delete(self, where_filter: Any) -> bool:
-        models = await self.get_all(where_filter)
-        if not models:
+        keys = []
+        try:
+            while True:
+                page = await self.__search_keys(where_filter, offset=len(keys), limit=self._batch_size, sort=False)
+                keys += page
+                if len(page) < self._batch_size:
+                    break
+        except NotFoundError:
             return False
-        await self._base_schemas.delete_many(models)
+        if not keys:
+            return False
+
+        for start in range(0, len(keys), self._batch_size):
+            await self._base_schemas.db().unlink(*keys[start:start + self._batch_size])
+        if self._cache_policy is not None and self._cache_policy.max_entries is not None:
+            await self._base_schemas.db().zrem(self.__lru_key(), *keys)
         return True
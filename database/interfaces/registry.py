@@ -0,0 +1,85 @@
+import logging
+from typing import Any, Union
+
+from aredis_om import Migrator
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import DeclarativeBase
+
+from .main_interface import MainCRUDInterface
+from .redis_json import BaseRedisInterface
+
+
+class CRUDRegistry:
+    def __init__(self):
+        self.__interfaces: dict[Any, MainCRUDInterface] = {}
+        self.__started = False
+
+    def __len__(self) -> int:
+        return len(self.__interfaces)
+
+    def __contains__(self, db_model: Any) -> bool:
+        return db_model in self.__interfaces
+
+    @property
+    def started(self) -> bool:
+        return self.__started
+
+    def register(self,
+                 db_model: Union[DeclarativeBase, Any],
+                 base_schemas: Union[BaseModel, Any],
+                 create_schemas: Union[BaseModel, Any],
+                 update_schemas: Union[BaseModel, Any],
+                 filters_schemas: Union[BaseModel, Any],
+                 **kwargs) -> MainCRUDInterface:
+        if self.__started:
+            raise RuntimeError("Models must be registered before CRUDRegistry.startup")
+        if db_model in self.__interfaces:
+            logging.error(f"{db_model} is already registered")
+            raise ValueError(f"{db_model} is already registered")
+
+        interface = MainCRUDInterface(db_model,
+                                      base_schemas,
+                                      create_schemas,
+                                      update_schemas,
+                                      filters_schemas,
+                                      **kwargs).prepare()
+        self.__interfaces[db_model] = interface
+        return interface
+
+    def __unique(self, attr: str) -> list[Any]:
+        items = {}
+        for interface in self.__interfaces.values():
+            item = getattr(interface, attr)
+            if item is not None:
+                items[id(item)] = item
+        return list(items.values())
+
+    async def startup(self):
+        if self.__started:
+            return
+        caches = [interface.cache for interface in self.__interfaces.values()]
+        if any(isinstance(cache, BaseRedisInterface) for cache in caches):
+            await Migrator().run()
+        for cache in {id(cache): cache for cache in caches
+                      if not isinstance(cache, BaseRedisInterface)}.values():
+            await cache.migrate()
+        for bus in self.__unique("_invalidation_bus"):
+            await bus.start()
+        self.__started = True
+
+    def bind(self, db_model: Union[DeclarativeBase, Any], session: AsyncSession) -> MainCRUDInterface:
+        interface = self.__interfaces.get(db_model)
+        if interface is None:
+            logging.error(f"{db_model} is not registered")
+            raise KeyError(f"{db_model} is not registered")
+        if not self.__started:
+            raise RuntimeError("CRUDRegistry.startup must be awaited before bind")
+        return interface.bind(session)
+
+    async def shutdown(self):
+        for writer in self.__unique("_cache_writer"):
+            await writer.close()
+        for bus in self.__unique("_invalidation_bus"):
+            await bus.close()
+        self.__started = False
@@ -0,0 +1,107 @@
+import json
+import logging
+import zlib
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+
+class BlobSerializer:
+    formats = ("json", "orjson", "msgpack")
+    compressions = (None, "zlib", "zstd", "lz4")
+    blob_field = "__blob"
+
+    def __init__(self,
+                 format: str = "json",
+                 compression: Optional[str] = None,
+                 level: Optional[int] = None,
+                 min_size: int = 256):
+        if format not in self.formats:
+            logging.error(f"Unknown serialization format {format}")
+            raise ValueError(f"Unknown serialization format {format}")
+        if compression not in self.compressions:
+            logging.error(f"Unknown compression {compression}")
+            raise ValueError(f"Unknown compression {compression}")
+
+        self.__require(format == "orjson", orjson, "orjson")
+        self.__require(format == "msgpack", msgpack, "msgpack")
+        self.__require(compression == "zstd", zstandard, "zstandard")
+        self.__require(compression == "lz4", lz4_frame, "lz4")
+
+        self.format = format
+        self.compression = compression
+        self.level = level
+        self.min_size = min_size
+
+        if compression == "zstd":
+            self.__compressor = zstandard.ZstdCompressor(level=level or 3)
+            self.__decompressor = zstandard.ZstdDecompressor()
+
+    @staticmethod
+    def __require(used: bool, module: Any, package: str):
+        if used and module is None:
+            logging.error(f"`{package}` package is required for this serializer")
+            raise ImportError(f"`{package}` package is required for this serializer")
+
+    def __encode(self, document: dict) -> bytes:
+        if self.format == "orjson":
+            return orjson.dumps(document)
+        if self.format == "msgpack":
+            return msgpack.packb(document, use_bin_type=True)
+        return json.dumps(document, separators=(",", ":")).encode()
+
+    def __decode(self, data: bytes) -> dict:
+        if self.format == "orjson":
+            return orjson.loads(data)
+        if self.format == "msgpack":
+            return msgpack.unpackb(data, raw=False)
+        return json.loads(data)
+
+    def __compress(self, data: bytes) -> bytes:
+        if self.compression == "zlib":
+            return zlib.compress(data, self.level if self.level is not None else 6)
+        if self.compression == "zstd":
+            return self.__compressor.compress(data)
+        if self.compression == "lz4":
+            return lz4_frame.compress(data, compression_level=self.level or 0)
+        return data
+
+    def __decompress(self, data: bytes) -> bytes:
+        if self.compression == "zlib":
+            return zlib.decompress(data)
+        if self.compression == "zstd":
+            return self.__decompressor.decompress(data)
+        if self.compression == "lz4":
+            return lz4_frame.decompress(data)
+        return data
+
+    def dumps(self, document: dict) -> bytes:
+        data = self.__encode(document)
+        if self.compression is None:
+            return data
+        if len(data) < self.min_size:
+            return b"\x00" + data
+        return b"\x01" + self.__compress(data)
+
+    def loads(self, data: bytes) -> dict:
+        if self.compression is not None:
+            data = self.__decompress(data[1:]) if data[:1] == b"\x01" else data[1:]
+        return self.__decode(data)
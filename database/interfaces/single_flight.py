@@ -0,0 +1,25 @@
+import asyncio
+from functools import partial
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    def __init__(self):
+        self.__calls: dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self.__calls)
+
+    def __done(self, key: Hashable, task: asyncio.Task):
+        if self.__calls.get(key) is task:
+            del self.__calls[key]
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        task = self.__calls.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(func())
+            task.add_done_callback(partial(self.__done, key))
+            self.__calls[key] = task
+        return await asyncio.shield(task)
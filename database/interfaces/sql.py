@@ -1,8 +1,9 @@
 import logging
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Optional
 
 from pydantic import BaseModel
-from sqlalchemy import select, update, delete, func, distinct
+from sqlalchemy import select, update, delete, insert, func, distinct, bindparam, UniqueConstraint
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 
@@ -14,19 +15,56 @@ class BaseSQLInterface(BaseDBInterface, SchemasValidator):
     _base_schemas = None
     _create_schemas = None
     _update_schemas = None
+    _batch_size = 1000
+    _statement_cache: dict[tuple, Any] = {}
+    _column_plans: dict[tuple, tuple[tuple[str, ...], bool]] = {}
+    _unique_plans: dict[Any, tuple[frozenset[str], ...]] = {}
 
     def __init__(self, session: AsyncSession,
                  db_model: DeclarativeBase,
                  base_schemas: BaseModel.model_json_schema,
                  create_schemas: BaseModel.model_json_schema,
                  update_schemas: BaseModel.model_json_schema,
-                 filter_schemas: BaseModel.model_json_schema):
+                 filter_schemas: BaseModel.model_json_schema,
+                 trust_db_rows: bool = False):
         self.session = session
         self._db_model = db_model
         self._base_schemas = base_schemas
         self._create_schemas = create_schemas
         self._update_schemas = update_schemas
         self._filter_schemas = filter_schemas
+        self._trust_db_rows = trust_db_rows
+
+        self._columns, self._with_pk = self.compile_columns(self._db_model, self._base_schemas)
+
+    @classmethod
+    def compile_columns(cls,
+                        db_model: DeclarativeBase,
+                        base_schemas: BaseModel.model_json_schema) -> tuple[tuple[str, ...], bool]:
+        key = (db_model, base_schemas)
+        plan = cls._column_plans.get(key)
+        if plan is None:
+            schema_fields = base_schemas.model_fields
+            columns = tuple(column for column in db_model.__mapper__.column_attrs.keys()
+                            if column in schema_fields)
+            plan = (columns, "pk" in schema_fields and "pk" not in columns)
+            cls._column_plans[key] = plan
+        return plan
+
+    @classmethod
+    def compile_unique_keys(cls, db_model: DeclarativeBase) -> tuple[frozenset[str], ...]:
+        plan = cls._unique_plans.get(db_model)
+        if plan is None:
+            table = db_model.__table__
+            keys = {frozenset(column.key for column in table.primary_key.columns)}
+            keys.update(frozenset([column.key]) for column in table.columns if column.unique)
+            keys.update(frozenset(column.key for column in constraint.columns)
+                        for constraint in table.constraints if isinstance(constraint, UniqueConstraint))
+            keys.update(frozenset(column.key for column in index.columns)
+                        for index in table.indexes if index.unique)
+            plan = tuple(keys)
+            cls._unique_plans[db_model] = plan
+        return plan
 
     async def __add_filter_to_query(self, query: Any, **kwargs) -> Any:
         if kwargs:
@@ -37,10 +75,61 @@ class BaseSQLInterface(BaseDBInterface, SchemasValidator):
     async def __set_delete_at_limit(self, query: Any) -> Any:
         return query.where(self._db_model.delete_at.is_(None))
 
+    def __projection(self, columns: Optional[list[str]]) -> tuple[str, ...]:
+        if columns is None:
+            return self._columns
+
+        for column in columns:
+            if column not in self._db_model.__mapper__.column_attrs:
+                logging.error(f"{self._db_model} has not column {column}")
+                raise KeyError(f"{self._db_model} has not column {column}")
+        return tuple(columns)
+
+    def __to_schema(self, row: Any, construct: bool) -> _base_schemas:
+        values = dict(row)
+        if self._with_pk and "id" in values:
+            values["pk"] = str(values["id"])
+
+        if construct:
+            return self._base_schemas.model_construct(**values)
+        return self._base_schemas.model_validate(values)
+
+    async def __select_query(self,
+                             kind: str,
+                             offset: bool = False,
+                             limit: bool = False,
+                             columns: tuple[str, ...] = (),
+                             **kwargs) -> tuple[Any, dict]:
+        filters = await self.valid_schema(self._filter_schemas, **kwargs)
+        filter_columns = tuple(sorted(filters))
+
+        key = (self._db_model, kind, columns, filter_columns, offset, limit)
+        query = self._statement_cache.get(key)
+        if query is None:
+            if kind == "ids":
+                query = select(self._db_model.id).order_by(self._db_model.id)
+            else:
+                query = select(*[getattr(self._db_model, column) for column in columns])
+                if kind == "stream":
+                    query = query.order_by(self._db_model.id)
+
+            for column in filter_columns:
+                query = query.where(getattr(self._db_model, column) == bindparam(f"filter_{column}"))
+            query = query.where(self._db_model.delete_at.is_(None))
+
+            if offset:
+                query = query.offset(bindparam("offset"))
+            if limit:
+                query = query.limit(bindparam("limit"))
+            self._statement_cache[key] = query
+
+        return query, {f"filter_{column}": value for column, value in filters.items()}
+
     async def query_execute(self,
-                            query: Any = None) -> Any:
+                            query: Any = None,
+                            params: Any = None) -> Any:
         try:
-            return await self.session.execute(query)
+            return await self.session.execute(query, params)
         except Exception as e:
             await self.session.rollback()
             logging.error(e)
@@ -48,54 +137,95 @@ class BaseSQLInterface(BaseDBInterface, SchemasValidator):
 
     async def get_one_or_none(self,
                               where_filter: Any = None,
+                              columns: Optional[list[str]] = None,
                               **kwargs) -> Optional[_base_schemas]:
 
         if where_filter is None and not kwargs:
             raise ValueError('At least one of `where_filter` or `kwargs` must be set')
 
-        query = select(self._db_model)
-
-        query = await self.__add_filter_to_query(query, **kwargs)
-        query = await self.__set_delete_at_limit(query)
+        projection = self.__projection(columns)
+        query, params = await self.__select_query("object", columns=projection, **kwargs)
 
         if where_filter is not None:
             query = query.where(where_filter)
 
-        res = await self.query_execute(query)
-        response_object = res.scalars().one_or_none()
+        res = await self.query_execute(query, params)
+        response_object = res.mappings().one_or_none()
 
         if not response_object:
             return None
-        return self._base_schemas.model_validate(response_object, from_attributes=True)
+        return self.__to_schema(response_object, columns is not None or self._trust_db_rows)
 
     async def get_all(self,
                       where_filter: Any = None,
                       limit: int = 10,
                       offset: int = 0,
                       no_limit: bool = False,
+                      columns: Optional[list[str]] = None,
                       **kwargs) -> list[_base_schemas]:
 
-        if no_limit:
-            query = select(self._db_model).offset(offset)
-        else:
-            query = select(self._db_model).offset(offset).limit(limit)
-
-        query = await self.__add_filter_to_query(query, **kwargs)
-        query = await self.__set_delete_at_limit(query)
+        projection = self.__projection(columns)
+        query, params = await self.__select_query("object", offset=True, limit=not no_limit,
+                                                  columns=projection, **kwargs)
+        params["offset"] = offset
+        if not no_limit:
+            params["limit"] = limit
 
         if where_filter is not None:
             query = query.where(where_filter)
 
-        res = await self.query_execute(query)
-        response_object = res.scalars().all()
+        res = await self.query_execute(query, params)
+        response_object = res.mappings().all()
 
         if not response_object:
             return []
-        return [self._base_schemas.model_validate(resp_obj, from_attributes=True) for resp_obj in response_object]
+        construct = columns is not None or self._trust_db_rows
+        return [self.__to_schema(resp_obj, construct) for resp_obj in response_object]
+
+    async def iter_all(self,
+                       where_filter: Any = None,
+                       chunk_size: int = 1000,
+                       columns: Optional[list[str]] = None,
+                       **kwargs) -> AsyncIterator[list[_base_schemas]]:
+        projection = self.__projection(columns)
+        query, params = await self.__select_query("stream", columns=projection, **kwargs)
+
+        if where_filter is not None:
+            query = query.where(where_filter)
+
+        try:
+            res = await self.session.stream(query.execution_options(yield_per=chunk_size), params)
+        except Exception as e:
+            await self.session.rollback()
+            logging.error(e)
+            raise e
+
+        construct = columns is not None or self._trust_db_rows
+        try:
+            async for response_object in res.mappings().partitions(chunk_size):
+                yield [self.__to_schema(resp_obj, construct) for resp_obj in response_object]
+        finally:
+            await res.close()
+
+    async def get_ids(self,
+                      where_filter: Any = None,
+                      limit: int = 10,
+                      offset: int = 0,
+                      **kwargs) -> list[Any]:
+        query, params = await self.__select_query("ids", offset=True, limit=True, **kwargs)
+        params["offset"] = offset
+        params["limit"] = limit
+
+        if where_filter is not None:
+            query = query.where(where_filter)
+
+        res = await self.query_execute(query, params)
+        return list(res.scalars().all())
 
     async def delete(self,
                      where_filter: Any = None,
-                     **kwargs) -> bool:
+                     returning: bool = False,
+                     **kwargs) -> bool | list[Any]:
         if where_filter is None and not kwargs:
             raise ValueError('At least one of `where_filter` or `kwargs` must be set')
 
@@ -107,12 +237,17 @@ class BaseSQLInterface(BaseDBInterface, SchemasValidator):
         if where_filter is not None:
             query = query.where(where_filter)
 
+        if returning:
+            res = await self.query_execute(query.returning(self._db_model.id))
+            return list(res.scalars().all())
+
         await self.query_execute(query)
         return True
 
     async def soft_delete(self,
                           where_filter: Any = None,
-                          **kwargs) -> bool:
+                          returning: bool = False,
+                          **kwargs) -> bool | list[Any]:
         if where_filter is None and not kwargs:
             raise ValueError('At least one of `where_filter` or `kwargs` must be set')
 
@@ -126,13 +261,18 @@ class BaseSQLInterface(BaseDBInterface, SchemasValidator):
 
         query = query.values(delete_at=func.now())
 
+        if returning:
+            res = await self.query_execute(query.returning(self._db_model.id))
+            return list(res.scalars().all())
+
         await self.query_execute(query)
         return True
 
     async def update(self,
                      update_object: dict,
                      where_filter: Any = None,
-                     **kwargs) -> bool:
+                     returning: bool = False,
+                     **kwargs) -> bool | list[_base_schemas]:
 
         if where_filter is None and not kwargs:
             raise ValueError('At least one of `where_filter` or `kwargs` must be set')
@@ -149,11 +289,21 @@ class BaseSQLInterface(BaseDBInterface, SchemasValidator):
 
         query = query.values(**update_object)
 
+        if returning:
+            query = query.returning(self._db_model).execution_options(populate_existing=True)
+            res = await self.query_execute(query)
+            return [self._base_schemas.model_validate(resp_obj, from_attributes=True)
+                    for resp_obj in res.scalars().all()]
+
         await self.query_execute(query)
         return True
 
     async def create(self,
-                     create_object: _create_schemas | list[_create_schemas]) -> bool:
+                     create_object: _create_schemas | list[_create_schemas],
+                     returning: bool = False) -> Any:
+        if returning:
+            return await self.__create_returning(create_object)
+
         if isinstance(create_object, list):
             add_object = [self._db_model(**obj.model_dump()) for obj in create_object]
             self.session.add_all(add_object)
@@ -163,6 +313,57 @@ class BaseSQLInterface(BaseDBInterface, SchemasValidator):
 
         return add_object
 
+    async def __create_returning(self,
+                                 create_object: _create_schemas | list[_create_schemas]
+                                 ) -> _base_schemas | list[_base_schemas]:
+        objects = create_object if isinstance(create_object, list) else [create_object]
+        if not objects:
+            return []
+
+        query = insert(self._db_model).returning(self._db_model, sort_by_parameter_order=True)
+        res = await self.query_execute(query, [obj.model_dump() for obj in objects])
+        response_object = [self._base_schemas.model_validate(resp_obj, from_attributes=True)
+                           for resp_obj in res.scalars().all()]
+
+        if isinstance(create_object, list):
+            return response_object
+        return response_object[0]
+
+    async def upsert_many(self,
+                          upsert_object: list[_create_schemas],
+                          conflict_columns: list[str]) -> list[_base_schemas]:
+        if not conflict_columns:
+            raise ValueError('`conflict_columns` must be set')
+        for column in conflict_columns:
+            if column not in self._create_schemas.model_fields:
+                logging.error(f"{self._create_schemas} has not filed {column}")
+                raise ValueError(f"{self._create_schemas} has not filed {column}")
+        if frozenset(conflict_columns) not in self.compile_unique_keys(self._db_model):
+            logging.error(f"{self._db_model} has no unique constraint on {conflict_columns}")
+            raise ValueError(f"{self._db_model} has no unique constraint on {conflict_columns}")
+
+        values = {}
+        for obj in upsert_object:
+            value = obj.model_dump()
+            values[tuple(value[key] for key in conflict_columns)] = value
+        values = list(values.values())
+
+        res = []
+        for start in range(0, len(values), self._batch_size):
+            query = pg_insert(self._db_model).values(values[start:start + self._batch_size])
+            set_values = {key: getattr(query.excluded, key)
+                          for key in values[0].keys() if key not in conflict_columns}
+            set_values["update_at"] = func.now()
+            set_values["delete_at"] = None
+            query = query.on_conflict_do_update(index_elements=conflict_columns,
+                                                set_=set_values).returning(self._db_model)
+            query = query.execution_options(populate_existing=True)
+
+            response_object = await self.query_execute(query)
+            res += [self._base_schemas.model_validate(resp_obj, from_attributes=True)
+                    for resp_obj in response_object.scalars().all()]
+        return res
+
     async def uniq_col_value(self, col_name: str):
         model_item = getattr(self._db_model, col_name)
         result = await self.session.execute(select(distinct(model_item)))
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+
+class WriteBehindQueue:
+    def __init__(self,
+                 writer: Optional[Callable[[list[Any]], Awaitable[Any]]] = None,
+                 max_size: int = 10000,
+                 batch_size: int = 500,
+                 concurrency: int = 4,
+                 key: Optional[Callable[[Any], Any]] = None):
+        if max_size <= 0 or batch_size <= 0 or concurrency <= 0:
+            raise ValueError("max_size, batch_size and concurrency must be greater than 0")
+
+        self._writer = writer
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self._key = key or (lambda obj: obj.id)
+        self.__pending: dict[Any, Any] = {}
+        self.__in_flight: set[Any] = set()
+        self.__discarded: set[Any] = set()
+        self.__workers: set[asyncio.Task] = set()
+        self.__not_full: Optional[asyncio.Condition] = None
+        self.__closed = False
+
+    def __len__(self) -> int:
+        return len(self.__pending)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self.__in_flight)
+
+    @property
+    def closed(self) -> bool:
+        return self.__closed
+
+    @property
+    def writer(self) -> Optional[Callable[[list[Any]], Awaitable[Any]]]:
+        return self._writer
+
+    def bind(self, writer: Callable[[list[Any]], Awaitable[Any]]) -> "WriteBehindQueue":
+        if self._writer is not None and self._writer != writer:
+            logging.error("WriteBehindQueue is already bound to another writer")
+            raise ValueError("WriteBehindQueue is already bound to another writer")
+        self._writer = writer
+        return self
+
+    def __condition(self) -> asyncio.Condition:
+        if self.__not_full is None:
+            self.__not_full = asyncio.Condition()
+        return self.__not_full
+
+    async def put(self, objects: Any | list[Any]):
+        if self.__closed:
+            raise RuntimeError("WriteBehindQueue is closed")
+        if self._writer is None:
+            raise RuntimeError("WriteBehindQueue has no writer")
+        if not isinstance(objects, list):
+            objects = [objects]
+
+        for obj in objects:
+            key = self._key(obj)
+            if key not in self.__pending and len(self.__pending) >= self.max_size:
+                self.__schedule()
+                async with self.__condition():
+                    await self.__condition().wait_for(lambda: len(self.__pending) < self.max_size)
+            self.__pending.pop(key, None)
+            self.__pending[key] = obj
+
+        self.__schedule()
+
+    def __schedule(self):
+        batches = -(-len(self.__pending) // self.batch_size)
+        for _ in range(min(batches, self.concurrency - len(self.__workers))):
+            worker = asyncio.create_task(self.__worker())
+            self.__workers.add(worker)
+            worker.add_done_callback(self.__workers.discard)
+
+    def __take_batch(self) -> dict[Any, Any]:
+        batch = {}
+        for key in list(self.__pending.keys()):
+            if key in self.__in_flight:
+                continue
+            batch[key] = self.__pending.pop(key)
+            if len(batch) >= self.batch_size:
+                break
+        self.__in_flight.update(batch.keys())
+        return batch
+
+    async def __worker(self):
+        while True:
+            batch = self.__take_batch()
+            if not batch:
+                return
+
+            async with self.__condition():
+                self.__condition().notify_all()
+
+            objects = [obj for key, obj in batch.items() if key not in self.__discarded]
+            try:
+                if objects:
+                    await self._writer(objects)
+            except Exception as e:
+                logging.error(e)
+            finally:
+                self.__in_flight.difference_update(batch.keys())
+                self.__discarded.difference_update(batch.keys())
+                async with self.__condition():
+                    self.__condition().notify_all()
+
+    async def discard(self, keys: list[Any]):
+        for key in keys:
+            self.__pending.pop(key, None)
+
+        in_flight = self.__in_flight.intersection(keys)
+        if not in_flight:
+            return
+        self.__discarded.update(in_flight)
+        async with self.__condition():
+            await self.__condition().wait_for(lambda: not self.__in_flight.intersection(in_flight))
+
+    async def drain(self):
+        while self.__pending or self.__workers:
+            self.__schedule()
+            if self.__workers:
+                await asyncio.gather(*list(self.__workers))
+            else:
+                await asyncio.sleep(0)
+
+    async def close(self):
+        self.__closed = True
+        await self.drain()
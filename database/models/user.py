@@ -9,7 +9,7 @@ class UserModel(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
 
-    tg_id: Mapped[int] = mapped_column(BIGINT, nullable=False)
+    tg_id: Mapped[int] = mapped_column(BIGINT, nullable=False, unique=True)
     fio: Mapped[str] = mapped_column()
     group: Mapped[str] = mapped_column()
     allow: Mapped[bool] = mapped_column()
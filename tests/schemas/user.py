@@ -21,8 +21,26 @@ class UserUpdate(BaseModel):
 
 
 class UserSchemas(UserCreate, BaseRedisModel):
-    id: int = Field(index=True)
+    id: int = Field(index=True, sortable=True)
 
 
 class UserFilters(UserUpdate):
     id: int | None = None
+
+
+class UserProfileSchemas(UserSchemas):
+    about: str = ""
+    settings: str = ""
+    note: str | None = None
+
+
+def make_user(user_id: int, **kwargs) -> UserSchemas:
+    return UserSchemas(**{
+        "id": user_id,
+        "tg_id": user_id,
+        "fio": f"Aboba {user_id}",
+        "group": f"XD {user_id}",
+        "allow": True,
+        "pk": str(user_id),
+        **kwargs
+    })
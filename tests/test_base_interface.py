@@ -0,0 +1,52 @@
+import pytest
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+from database.interfaces.base_interface import SchemasValidator
+from .schemas.user import *
+
+
+class ConstrainedFilters(BaseModel):
+    fio: str | None = Field(None, max_length=3)
+
+
+class StrippedFilters(BaseModel):
+    fio: str | None = None
+
+    @field_validator("fio")
+    @classmethod
+    def strip_fio(cls, value):
+        return value.strip() if value is not None else value
+
+
+class TestSchemasValidator:
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_valid_schema(self):
+        res_1 = await SchemasValidator.valid_schema(UserFilters, tg_id=1, fio="Aboba 1")
+        assert res_1 == {"tg_id": 1, "fio": "Aboba 1"}
+
+        res_2 = await SchemasValidator.valid_schema(UserFilters)
+        assert res_2 == {}
+
+        field_types, plain = SchemasValidator.compile_schema(UserFilters)
+        assert field_types["allow"] == bool
+        assert plain == True
+        assert SchemasValidator.compile_schema(UserFilters)[0] is field_types
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_invalid_schema(self):
+        with pytest.raises(KeyError):
+            await SchemasValidator.valid_schema(UserFilters, pk="1")
+
+        with pytest.raises(ValueError):
+            await SchemasValidator.valid_schema(UserFilters, tg_id="1")
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_constrained_schema(self):
+        assert SchemasValidator.compile_schema(ConstrainedFilters)[1] == False
+        assert SchemasValidator.compile_schema(StrippedFilters)[1] == False
+
+        with pytest.raises(ValidationError):
+            await SchemasValidator.valid_schema(ConstrainedFilters, fio="abcdefgh")
+
+        res_1 = await SchemasValidator.valid_schema(StrippedFilters, fio="  Aboba  ")
+        assert res_1 == {"fio": "Aboba"}
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from database.interfaces.batch_loader import BatchLoader
+
+
+class TestBatchLoader:
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_load(self):
+        batch_loader = BatchLoader()
+        calls = []
+
+        async def query(keys):
+            calls.append(keys)
+            await asyncio.sleep(0.01)
+            return {key: key * 10 for key in keys if key != 3}
+
+        res = await asyncio.gather(*[batch_loader.load("id", key, query) for key in [1, 2, 3, 2]])
+        assert res == [10, 20, None, 20]
+        assert calls == [[1, 2, 3]]
+        assert len(batch_loader) == 0
+
+        assert await batch_loader.load("id", 5, query) == 50
+        assert calls[-1] == [5]
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_duplicate_keys(self):
+        batch_loader = BatchLoader()
+        calls = []
+
+        async def query(keys):
+            calls.append(keys)
+            return {key: f"v{key}" for key in keys}
+
+        res = await asyncio.gather(batch_loader.load("id", 1, query), batch_loader.load("id", 1, query))
+        assert res == ["v1", "v1"]
+        assert calls == [[1]]
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_groups(self):
+        batch_loader = BatchLoader(max_batch_size=2)
+        calls = []
+
+        async def query(keys):
+            calls.append(keys)
+            return {key: key for key in keys}
+
+        res = await asyncio.gather(*[batch_loader.load("id", key, query) for key in range(5)],
+                                   *[batch_loader.load("tg_id", key, query) for key in range(2)])
+        assert res == [0, 1, 2, 3, 4, 0, 1]
+        assert sorted(calls) == [[0, 1], [0, 1], [2, 3], [4]]
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_delay(self):
+        batch_loader = BatchLoader(delay=0.01)
+        calls = []
+
+        async def query(keys):
+            calls.append(keys)
+            return {key: key for key in keys}
+
+        async def later(key):
+            await asyncio.sleep(0.001)
+            return await batch_loader.load("id", key, query)
+
+        res = await asyncio.gather(batch_loader.load("id", 1, query), later(2))
+        assert res == [1, 2]
+        assert calls == [[1, 2]]
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_error(self):
+        batch_loader = BatchLoader()
+
+        async def query(keys):
+            await asyncio.sleep(0.01)
+            raise ValueError("query failed")
+
+        res = await asyncio.gather(*[batch_loader.load("id", key, query) for key in range(3)],
+                                   return_exceptions=True)
+        assert all(isinstance(item, ValueError) for item in res)
+        assert len(batch_loader) == 0
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_cancel(self):
+        batch_loader = BatchLoader()
+
+        async def query(keys):
+            await asyncio.sleep(0.01)
+            return {key: key for key in keys}
+
+        leader = asyncio.ensure_future(batch_loader.load("id", 1, query))
+        follower = asyncio.ensure_future(batch_loader.load("id", 2, query))
+        await asyncio.sleep(0)
+        leader.cancel()
+        assert await follower == 2
+        assert leader.cancelled() == True
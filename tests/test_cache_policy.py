@@ -0,0 +1,23 @@
+import pytest
+
+from database.interfaces.cache_policy import CachePolicy
+
+
+class TestCachePolicy:
+    def test_defaults(self):
+        policy = CachePolicy()
+        assert policy.ttl == 3600
+        assert policy.tracks_access == False
+
+        assert CachePolicy(max_entries=10).tracks_access == True
+        assert CachePolicy(ttl=10, sliding=True).tracks_access == True
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            CachePolicy(ttl=0)
+
+        with pytest.raises(ValueError):
+            CachePolicy(max_entries=0)
+
+        with pytest.raises(ValueError):
+            CachePolicy(ttl=None, sliding=True)
@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from database.interfaces.invalidation import InvalidationBus
+from database.interfaces.local_cache import LocalCache
+from database.interfaces.memory import BaseMemoryInterface
+from .schemas.user import *
+
+
+def make_cache() -> LocalCache:
+    cache = LocalCache(max_size=10, ttl=60, negative_ttl=60)
+    cache.set(LocalCache.make_key(id=1), make_user(1))
+    cache.set(LocalCache.make_key(id=2), make_user(2))
+    cache.set_not_found(LocalCache.make_key(tg_id=9))
+    cache.set_not_found(LocalCache.make_key(tg_id=10))
+    return cache
+
+
+class DroppingRedis:
+    def __init__(self, redis):
+        self.redis = redis
+        self.connections = 0
+
+    def pubsub(self, **kwargs):
+        self.connections += 1
+        pubsub = self.redis.pubsub(**kwargs)
+        if self.connections == 1:
+            pubsub.listen = self.drop
+        return pubsub
+
+    @staticmethod
+    async def drop():
+        raise ConnectionError("Connection closed by server.")
+        yield
+
+
+class TestInvalidationHandle:
+    def test_handle(self):
+        bus = InvalidationBus()
+        cache = make_cache()
+        bus.subscribe("users", cache)
+
+        bus.handle('{"s":"other","m":"users","i":[1]}')
+        assert cache.get(LocalCache.make_key(id=1)) == None
+        assert cache.get(LocalCache.make_key(id=2)) != None
+        assert len(cache) == 3
+
+        bus.handle('{"s":"other","m":"users","i":[],"r":[{"id":3,"tg_id":9}]}')
+        assert cache.get(LocalCache.make_key(tg_id=9)) == None
+        assert cache.get(LocalCache.make_key(tg_id=10)) != None
+        assert len(cache) == 2
+
+    def test_handle_skip(self):
+        bus = InvalidationBus()
+        cache = make_cache()
+        bus.subscribe("users", cache)
+
+        bus.handle('{"s":"%s","m":"users","i":[1]}' % bus.source)
+        bus.handle('{"s":"other","m":"groups","i":[2]}')
+        assert len(cache) == 4
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_handle_memory(self):
+        bus = InvalidationBus()
+        cache = BaseMemoryInterface(UserSchemas, UserFilters)
+        await cache.create([make_user(1), make_user(2)])
+        bus.subscribe("users", cache)
+
+        bus.handle('{"s":"other","m":"users","i":[1],"r":[{"id":1,"tg_id":1}]}')
+        assert await cache.get_by_ids([1]) == {}
+        assert await cache.get_one_or_none(tg_id=1) == None
+        assert len(cache) == 1
+
+
+class TestInvalidationBus:
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_publish(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        publisher = InvalidationBus(redis=fakeredis.FakeAsyncRedis(server=server))
+        listener = InvalidationBus(redis=fakeredis.FakeAsyncRedis(server=server))
+        cache = make_cache()
+        listener.subscribe("users", cache)
+
+        await listener.start()
+        assert listener.running == True
+
+        await publisher.publish("users", [1, 2], rows=[{"id": 1, "tg_id": 10}])
+        for _ in range(50):
+            if len(cache) == 1:
+                break
+            await asyncio.sleep(0.01)
+        assert cache.get(LocalCache.make_key(id=1)) == None
+        assert cache.get(LocalCache.make_key(id=2)) == None
+        assert cache.get(LocalCache.make_key(tg_id=10)) == None
+        assert cache.get(LocalCache.make_key(tg_id=9)) != None
+
+        await listener.close()
+        assert listener.running == False
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_reconnect(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        publisher = InvalidationBus(redis=fakeredis.FakeAsyncRedis(server=server))
+        redis = DroppingRedis(fakeredis.FakeAsyncRedis(server=server))
+        listener = InvalidationBus(redis=redis, reconnect_delay=0.01)
+        cache = make_cache()
+        listener.subscribe("users", cache)
+
+        await listener.start()
+        for _ in range(50):
+            if redis.connections == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert redis.connections == 2
+        assert listener.running == True
+        assert len(cache) == 0
+
+        cache.set(LocalCache.make_key(id=1), make_user(1))
+        await publisher.publish("users", [1])
+        for _ in range(50):
+            if len(cache) == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert cache.get(LocalCache.make_key(id=1)) == None
+
+        await listener.close()
+        assert listener.running == False
+
+    def test_reconnect_delay(self):
+        with pytest.raises(ValueError):
+            InvalidationBus(reconnect_delay=0)
+        with pytest.raises(ValueError):
+            InvalidationBus(reconnect_delay=1, max_reconnect_delay=0.5)
@@ -0,0 +1,75 @@
+import time
+
+from database.interfaces.local_cache import LocalCache, NOT_FOUND
+from .schemas.user import *
+
+
+class TestLocalCache:
+    def test_get_set(self):
+        cache = LocalCache(max_size=10, ttl=60)
+
+        key = cache.make_key(tg_id=1)
+        assert cache.get(key) == None
+
+        cache.set(key, make_user(1))
+        res_1 = cache.get(key)
+        assert res_1 != None
+        assert res_1.tg_id == 1
+        assert cache.make_key(tg_id=1) == key
+        assert cache.make_key(tg_id=1, fio="Aboba 1") == cache.make_key(fio="Aboba 1", tg_id=1)
+
+    def test_lru(self):
+        cache = LocalCache(max_size=2, ttl=None)
+
+        cache.set(cache.make_key(id=0), make_user(0))
+        cache.set(cache.make_key(id=1), make_user(1))
+        cache.get(cache.make_key(id=0))
+        cache.set(cache.make_key(id=2), make_user(2))
+
+        assert len(cache) == 2
+        assert cache.get(cache.make_key(id=0)) != None
+        assert cache.get(cache.make_key(id=1)) == None
+        assert cache.get(cache.make_key(id=2)) != None
+
+    def test_ttl(self):
+        cache = LocalCache(max_size=10, ttl=0.01)
+
+        cache.set(cache.make_key(id=0), make_user(0))
+        time.sleep(0.02)
+        assert cache.get(cache.make_key(id=0)) == None
+        assert len(cache) == 0
+
+    def test_invalidate(self):
+        cache = LocalCache(max_size=10, ttl=60)
+
+        cache.set(cache.make_key(id=1), make_user(1))
+        cache.set(cache.make_key(tg_id=1), make_user(1))
+        cache.set(cache.make_key(id=2), make_user(2))
+
+        cache.invalidate([1])
+        assert len(cache) == 1
+        assert cache.get(cache.make_key(tg_id=1)) == None
+        assert cache.get(cache.make_key(id=2)) != None
+
+    def test_not_found(self):
+        cache = LocalCache(max_size=10, ttl=60, negative_ttl=60)
+
+        key = cache.make_key(tg_id=7)
+        cache.set_not_found(key)
+        assert cache.get(key) is NOT_FOUND
+
+        cache.invalidate_not_found([make_user(6)])
+        assert cache.get(key) is NOT_FOUND
+
+        cache.invalidate_not_found([UserCreate(**{
+            "tg_id": 7,
+            "fio": "Aboba 7",
+            "group": "XD 7",
+            "allow": True
+        })])
+        assert cache.get(key) == None
+        assert len(cache) == 0
+
+        cache_without_negative = LocalCache(max_size=10, ttl=60)
+        cache_without_negative.set_not_found(key)
+        assert cache_without_negative.get(key) == None
@@ -1,13 +1,24 @@
+import asyncio
+
 import pytest
 from sqlalchemy import and_
 
+from database.interfaces.batch_loader import BatchLoader
+from database.interfaces.local_cache import LocalCache
 from database.interfaces.main_interface import MainCRUDInterface
+from database.interfaces.memory import BaseMemoryInterface
+from database.interfaces.write_behind import WriteBehindQueue
 from database.models.user import UserModel
 from database.session import get_async_session
 from .conftest import clear_all
 from .schemas.user import *
 
 
+class BrokenMemoryInterface(BaseMemoryInterface):
+    async def create(self, create_object):
+        raise ConnectionError("cache is unavailable")
+
+
 @pytest.mark.run(order=3)
 class TestMainInterface:
     @pytest.mark.asyncio(loop_scope="session")
@@ -163,6 +174,59 @@ class TestMainInterface:
             )
             assert len(res_7) == 3
 
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_get_many(self):
+        async with get_async_session() as session:
+            interface = MainCRUDInterface(UserModel,
+                                    UserSchemas,
+                                    UserCreate,
+                                    UserUpdate,
+                                    UserFilters)
+            await interface._connect(session)
+
+            ids = [item.id for item in await interface.get_all(no_limit=True)]
+            assert len(ids) == 3
+
+            res_1 = await interface.get_many([ids[2], -1, ids[0], ids[2]])
+            assert [item.id for item in res_1] == [ids[2], ids[0], ids[2]]
+
+            res_2 = await interface.get_many([-1, -2])
+            assert res_2 == []
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_batch_loader(self):
+        async with get_async_session() as session:
+            interface = MainCRUDInterface(UserModel,
+                                    UserSchemas,
+                                    UserCreate,
+                                    UserUpdate,
+                                    UserFilters,
+                                    batch_loader=BatchLoader())
+            await interface._connect(session)
+
+            res_1 = await asyncio.gather(*[interface.get_one_or_none(tg_id=tg_id) for tg_id in [54, 0, 1000, 0]])
+            assert [item.tg_id if item else None for item in res_1] == [54, 0, None, 0]
+
+            res_2 = await asyncio.gather(*[interface.get_one_or_none(id=item.id) for item in res_1 if item])
+            assert [item.id for item in res_2] == [item.id for item in res_1 if item]
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_fill_error(self):
+        async with get_async_session() as session:
+            interface = MainCRUDInterface(UserModel,
+                                    UserSchemas,
+                                    UserCreate,
+                                    UserUpdate,
+                                    UserFilters,
+                                    cache_backend=BrokenMemoryInterface(UserSchemas, UserFilters))
+            await interface._connect(session)
+
+            res_1 = await interface.get_one_or_none(tg_id=54)
+            assert res_1.tg_id == 54
+
+            res_2 = await interface.get_many([res_1.id])
+            assert [item.id for item in res_2] == [res_1.id]
+
     @pytest.mark.asyncio(loop_scope="session")
     async def test_update(self):
         async with get_async_session() as session:
@@ -207,6 +271,47 @@ class TestMainInterface:
 
             await session.commit()
 
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_local_cache(self):
+        local_cache = LocalCache(max_size=10, ttl=60)
+        async with get_async_session() as session:
+            interface = MainCRUDInterface(UserModel,
+                                    UserSchemas,
+                                    UserCreate,
+                                    UserUpdate,
+                                    UserFilters,
+                                    local_cache=local_cache)
+            await interface._connect(session)
+
+            res_1 = await interface.get_one_or_none(
+                tg_id=54,
+            )
+            assert res_1 != None
+            assert len(local_cache) == 1
+
+            res_2 = await interface.get_one_or_none(
+                tg_id=54,
+            )
+            assert res_2 != None
+            assert res_2.id == res_1.id
+
+            await interface.update(
+                update_object={
+                    "fio": "Local_54"
+                },
+                tg_id=54,
+            )
+            await session.flush()
+            assert len(local_cache) == 0
+
+            res_3 = await interface.get_one_or_none(
+                tg_id=54,
+            )
+            assert res_3 != None
+            assert res_3.fio == "Local_54"
+
+            await session.commit()
+
     @pytest.mark.asyncio(loop_scope="session")
     async def test_uniq_col_value(self):
         async with get_async_session() as session:
@@ -262,3 +367,184 @@ class TestMainInterface:
             assert res_2 == None
 
             await session.commit()
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_create_write_through(self):
+        async with get_async_session() as session:
+            interface = MainCRUDInterface(UserModel,
+                                    UserSchemas,
+                                    UserCreate,
+                                    UserUpdate,
+                                    UserFilters)
+            await interface._connect(session)
+
+            res_1 = await interface.create(
+                create_object=[
+                    UserCreate(**{
+                        "tg_id": 100,
+                        "fio": "Aboba_100",
+                        "group": "XD_100",
+                        "allow": True
+                    }),
+                    UserCreate(**{
+                        "tg_id": 101,
+                        "fio": "Aboba_101",
+                        "group": "XD_101",
+                        "allow": True
+                    })
+                ],
+                write_through=True
+            )
+            await session.commit()
+            assert len(res_1) == 2
+
+            res_2 = await interface.redis.get_by_ids([item.id for item in res_1])
+            assert len(res_2) == 2
+            assert res_2[res_1[0].id].tg_id == 100
+            assert res_2[res_1[1].id].tg_id == 101
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_upsert_many(self):
+        async with get_async_session() as session:
+            interface = MainCRUDInterface(UserModel,
+                                    UserSchemas,
+                                    UserCreate,
+                                    UserUpdate,
+                                    UserFilters)
+            await interface._connect(session)
+
+            res_1 = await interface.upsert_many(
+                upsert_object=[
+                    UserCreate(**{
+                        "tg_id": 100,
+                        "fio": "Upsert_100",
+                        "group": "XD_100",
+                        "allow": True
+                    }),
+                    UserCreate(**{
+                        "tg_id": 200,
+                        "fio": "Upsert_200",
+                        "group": "XD_200",
+                        "allow": True
+                    })
+                ],
+                conflict_columns=["tg_id"]
+            )
+            await session.commit()
+            assert len(res_1) == 2
+
+            res_2 = await interface.redis.get_by_ids([item.id for item in res_1])
+            assert len(res_2) == 2
+            assert res_2[res_1[0].id].fio == "Upsert_100"
+            assert res_2[res_1[1].id].fio == "Upsert_200"
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_write_behind_purge(self):
+        class SlowMemoryInterface(BaseMemoryInterface):
+            async def create(self, create_object):
+                await asyncio.sleep(0.05)
+                return await super().create(create_object)
+
+        cache = SlowMemoryInterface(UserSchemas, UserFilters)
+        cache_writer = WriteBehindQueue()
+        async with get_async_session() as session:
+            interface = MainCRUDInterface(UserModel,
+                                    UserSchemas,
+                                    UserCreate,
+                                    UserUpdate,
+                                    UserFilters,
+                                    cache_writer=cache_writer,
+                                    cache_backend=cache)
+            await interface._connect(session)
+            assert cache_writer.writer == cache.create
+
+            res_1 = await interface.get_one_or_none(tg_id=200)
+            assert res_1 != None
+
+            await interface.delete(soft=False, id=res_1.id)
+            await session.commit()
+            await cache_writer.drain()
+
+            assert await cache.get_by_ids([res_1.id]) == {}
+            assert await interface.get_one_or_none(id=res_1.id) == None
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_get_all_partial_cache(self):
+        cache = BaseMemoryInterface(UserSchemas, UserFilters)
+        async with get_async_session() as session:
+            interface = MainCRUDInterface(UserModel,
+                                    UserSchemas,
+                                    UserCreate,
+                                    UserUpdate,
+                                    UserFilters,
+                                    cache_backend=cache)
+            await interface._connect(session)
+
+            created = await interface.create(
+                create_object=[
+                    UserCreate(**{
+                        "tg_id": tg_id,
+                        "fio": f"Page_{tg_id}",
+                        "group": "Page",
+                        "allow": True
+                    })
+                    for tg_id in range(300, 306)
+                ],
+                write_through=True
+            )
+            await session.commit()
+            ids = [item.id for item in created]
+
+            cache.clear()
+            await cache.create([created[3], created[5]])
+
+            res_1 = await interface.get_all(where_filter_sql=UserModel.tg_id >= 300, limit=2)
+            assert [item.id for item in res_1] == ids[:2]
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_get_all_merge(self):
+        cache = BaseMemoryInterface(UserSchemas, UserFilters)
+        async with get_async_session() as session:
+            interface = MainCRUDInterface(UserModel,
+                                    UserSchemas,
+                                    UserCreate,
+                                    UserUpdate,
+                                    UserFilters,
+                                    cache_backend=cache)
+            await interface._connect(session)
+
+            created = await interface.create(
+                create_object=[
+                    UserCreate(**{
+                        "tg_id": tg_id,
+                        "fio": f"Merge_{tg_id}",
+                        "group": "Merge",
+                        "allow": True
+                    })
+                    for tg_id in range(310, 316)
+                ],
+                write_through=True
+            )
+            await session.commit()
+            ids = [item.id for item in created]
+
+            cache.clear()
+            await cache.create([created[1], created[3], created[5]])
+
+            calls = []
+            sql_get_all = interface.sql.get_all
+
+            async def get_all(*args, **kwargs):
+                calls.append(kwargs)
+                return await sql_get_all(*args, **kwargs)
+
+            interface.sql.get_all = get_all
+
+            res_1 = await interface.get_all(where_filter_sql=UserModel.tg_id >= 310, limit=4)
+            assert [item.id for item in res_1] == ids[:4]
+            assert len(calls) == 1
+            assert sorted(await cache.get_by_ids(ids)) == ids[:4] + ids[5:]
+
+            res_2 = await interface.get_all(where_filter_sql=UserModel.tg_id >= 310, limit=4)
+            assert [item.id for item in res_2] == ids[:4]
+            assert len(calls) == 1
@@ -0,0 +1,106 @@
+import time
+
+import pytest
+
+from database.interfaces.cache_policy import CachePolicy
+from database.interfaces.memory import BaseMemoryInterface
+from .schemas.user import *
+
+
+async def make_interface(**kwargs) -> BaseMemoryInterface:
+    interface = await BaseMemoryInterface(UserSchemas, UserFilters, **kwargs).migrate()
+    await interface.create([make_user(0), make_user(1), make_user(2, allow=False)])
+    return interface
+
+
+class TestMemoryInterface:
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_get_one(self):
+        interface = await make_interface()
+
+        res_1 = await interface.get_one_or_none(id=0)
+        assert res_1 != None
+        assert res_1.tg_id == 0
+
+        res_2 = await interface.get_one_or_none(UserSchemas.fio % "2")
+        assert res_2 != None
+        assert res_2.id == 2
+
+        res_3 = await interface.get_one_or_none(UserSchemas.tg_id >= 1, fio="Aboba 2")
+        assert res_3 != None
+        assert res_3.group == "XD 2"
+
+        res_4 = await interface.get_one_or_none(~(UserSchemas.tg_id << [0, 1]))
+        assert res_4.id == 2
+
+        assert await interface.get_one_or_none(tg_id=10) == None
+
+        with pytest.raises(ValueError):
+            await interface.get_one_or_none()
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_get_some(self):
+        interface = await make_interface()
+
+        res_1 = await interface.get_all(UserSchemas.tg_id >= 1)
+        assert [item.id for item in res_1] == [1, 2]
+
+        res_2 = await interface.get_all(UserSchemas.group % "XD", offset=1, limit=1)
+        assert [item.id for item in res_2] == [1]
+
+        res_3 = await interface.get_all(allow=True)
+        assert [item.id for item in res_3] == [0, 1]
+
+        res_4 = await interface.get_all((UserSchemas.allow == False) | (UserSchemas.id == 0))
+        assert [item.id for item in res_4] == [0, 2]
+
+        res_5 = await interface.get_by_ids([2, 5, 0])
+        assert sorted(res_5) == [0, 2]
+
+        res_6 = await interface.get_all(offset=1, limit=5)
+        assert [item.id for item in res_6] == [1, 2]
+
+        res_7 = await interface.get_by_values("tg_id", [2, 5, 1])
+        assert sorted(res_7) == [1, 2]
+        assert res_7[2].id == 2
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_replace(self):
+        interface = await make_interface()
+
+        user = make_user(1)
+        user.group = "XD new"
+        await interface.update(user)
+        user.group = "XD changed"
+
+        assert len(interface) == 3
+        assert await interface.get_one_or_none(group="XD 1") == None
+        res_1 = await interface.get_one_or_none(group="XD new")
+        assert res_1.id == 1
+
+        res_1.fio = "changed"
+        res_2 = await interface.get_by_ids([1])
+        assert res_2[1].fio == "Aboba 1"
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_delete(self):
+        interface = await make_interface()
+
+        assert await interface.delete(UserSchemas.tg_id >= 1) == True
+        assert await interface.delete(UserSchemas.tg_id >= 1) == False
+        assert len(interface) == 1
+
+        assert await interface.delete_by_ids([0]) == True
+        assert await interface.get_all() == []
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_cache_policy(self):
+        interface = await make_interface(cache_policy=CachePolicy(ttl=0.05, max_entries=3))
+
+        await interface.get_by_ids([0])
+        await interface.create(make_user(3))
+        assert sorted(await interface.get_by_ids([0, 1, 2, 3])) == [0, 2, 3]
+
+        time.sleep(0.06)
+        assert await interface.get_by_ids([0, 2, 3]) == {}
+        assert len(interface) == 0
@@ -0,0 +1,47 @@
+from database.interfaces.metrics import Metrics
+
+
+class TestMetrics:
+    def test_counter(self):
+        events = []
+        metrics = Metrics(callback=lambda name, value, labels: events.append((name, value, labels)))
+
+        metrics.inc("cache_hits_total", tier="redis")
+        metrics.inc("cache_hits_total", 2, tier="redis")
+        metrics.inc("cache_hits_total", tier="local")
+
+        assert metrics.counter("cache_hits_total", tier="redis") == 3
+        assert metrics.counter("cache_hits_total", tier="local") == 1
+        assert metrics.counter("cache_misses_total", tier="local") == 0
+        assert events[1] == ("cache_hits_total", 2, {"tier": "redis"})
+
+    def test_histogram(self):
+        metrics = Metrics(buckets=(0.1, 1.0))
+
+        metrics.observe("latency_seconds", 0.05, backend="sql")
+        metrics.observe("latency_seconds", 0.5, backend="sql")
+        metrics.observe("latency_seconds", 5, backend="sql")
+        with metrics.timer("latency_seconds", backend="redis"):
+            pass
+
+        assert metrics.histogram("latency_seconds", backend="sql") == (3, 5.55)
+        assert metrics.histogram("latency_seconds", backend="redis")[0] == 1
+
+        text = metrics.export_prometheus()
+        assert "# TYPE db_latency_seconds histogram" in text
+        assert 'db_latency_seconds_bucket{backend="sql",le="0.1"} 1' in text
+        assert 'db_latency_seconds_bucket{backend="sql",le="1.0"} 2' in text
+        assert 'db_latency_seconds_bucket{backend="sql",le="+Inf"} 3' in text
+        assert 'db_latency_seconds_count{backend="sql"} 3' in text
+
+    def test_gauge(self):
+        metrics = Metrics(namespace="app")
+        queue = [1, 2, 3]
+        metrics.gauge("queue_depth", lambda: len(queue), model="users")
+
+        assert metrics.value("queue_depth", model="users") == 3
+        queue.pop()
+        assert 'app_queue_depth{model="users"} 2' in metrics.export_prometheus()
+
+        metrics.reset()
+        assert metrics.value("queue_depth", model="users") == 2
@@ -1,8 +1,10 @@
 import pytest
 
+from database.interfaces.cache_policy import CachePolicy
 from database.interfaces.redis_json import BaseRedisInterface
+from database.interfaces.serializers import BlobSerializer
 from tests.conftest import clear_all
-from tests.schemas.user import UserSchemas, UserFilters
+from tests.schemas.user import UserSchemas, UserFilters, UserProfileSchemas, make_user
 
 
 @pytest.mark.run(order=2)
@@ -43,6 +45,31 @@ class TestRedisDB:
             })
         ])
 
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_create_replace(self):
+        interface = await BaseRedisInterface(UserSchemas,
+                                             UserFilters).migrate()
+
+        await interface.create([
+            UserSchemas(**{
+                "id": 1,
+                "tg_id": 1,
+                "fio": "Aboba 1",
+                "group": "XD 1",
+                "allow": True
+            }),
+            UserSchemas(**{
+                "id": 2,
+                "tg_id": 2,
+                "fio": "Aboba 2",
+                "group": "XD 2",
+                "allow": True
+            })
+        ])
+
+        res_1 = await interface.get_all(UserSchemas.id == 2)
+        assert len(res_1) == 1
+
     @pytest.mark.asyncio(loop_scope="session")
     async def test_get_one(self):
         interface = await BaseRedisInterface(UserSchemas,
@@ -51,6 +78,7 @@ class TestRedisDB:
         res_1 = await interface.get_one_or_none(id=0)
         assert res_1 != None
         assert res_1.tg_id == 0
+        assert res_1.allow is True
 
         res_2 = await interface.get_one_or_none(UserSchemas.fio == "Aboba 2")
         assert res_2 != None
@@ -92,6 +120,19 @@ class TestRedisDB:
         assert len(res_3) == 1
         assert res_3[0].group == "XD 2"
 
+        res_4 = await interface.get_all(UserSchemas.group % "XD", offset=1, limit=1)
+        assert len(res_4) == 1
+        assert res_4[0].id == 1
+
+        res_5 = await interface.get_all(UserSchemas.tg_id >= 1, offset=1, limit=10)
+        assert len(res_5) == 1
+        assert res_5[0].id == 2
+
+        res_6 = await interface.get_all(allow=True)
+        assert len(res_6) == 3
+        for item in res_6:
+            assert item.allow is True
+
     @pytest.mark.asyncio(loop_scope="session")
     async def test_delete(self):
         interface = await BaseRedisInterface(UserSchemas,
@@ -103,3 +144,105 @@ class TestRedisDB:
         res_2 = await interface.get_all()
         assert res_2 != None
         assert len(res_2) == 1
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_cache_policy(self):
+        interface = await BaseRedisInterface(UserSchemas,
+                                             UserFilters,
+                                             cache_policy=CachePolicy(ttl=100,
+                                                                      sliding=True,
+                                                                      max_entries=3)).migrate()
+
+        await interface.create([
+            UserSchemas(**{
+                "id": 100 + i,
+                "tg_id": 100 + i,
+                "fio": f"Aboba {100 + i}",
+                "group": "XD policy",
+                "allow": True
+            })
+            for i in range(3)
+        ])
+        assert 0 < await UserSchemas.db().ttl(UserSchemas.make_primary_key(100)) <= 100
+
+        res_1 = await interface.get_by_ids([100])
+        assert 100 in res_1
+
+        await interface.create(UserSchemas(**{
+            "id": 103,
+            "tg_id": 103,
+            "fio": "Aboba 103",
+            "group": "XD policy",
+            "allow": True
+        }))
+
+        res_2 = await interface.get_by_ids([100, 101, 102, 103])
+        assert sorted(res_2) == [100, 102, 103]
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_blob_serializer(self):
+        interface = await BaseRedisInterface(UserProfileSchemas,
+                                             UserFilters,
+                                             serializer=BlobSerializer(compression="zlib")).migrate()
+
+        await interface.create([
+            UserProfileSchemas(**{
+                "id": 200 + i,
+                "tg_id": 200 + i,
+                "fio": f"Aboba {200 + i}",
+                "group": "XD blob",
+                "allow": bool(i % 2),
+                "about": f"About {200 + i}"
+            })
+            for i in range(3)
+        ])
+
+        res_1 = await interface.get_by_ids([200, 201, 250])
+        assert sorted(res_1) == [200, 201]
+        assert res_1[201].allow is True
+        assert res_1[201].about == "About 201"
+
+        res_2 = await interface.get_one_or_none(tg_id=202)
+        assert res_2 != None
+        assert res_2.fio == "Aboba 202"
+        assert res_2.allow is False
+
+        res_3 = await interface.get_all(group="XD blob", offset=1, limit=5)
+        assert [item.id for item in res_3] == [201, 202]
+
+        res_4 = await interface.delete(UserProfileSchemas.group % "blob")
+        assert res_4 == True
+        assert await interface.get_by_ids([200, 201, 202]) == {}
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_blob_storage(self):
+        interface = await BaseRedisInterface(UserSchemas,
+                                             UserFilters,
+                                             serializer=BlobSerializer()).migrate()
+        await interface.create(make_user(210))
+
+        res_1 = await UserSchemas.db().hgetall(UserSchemas.make_primary_key(210))
+        assert "__blob" not in res_1
+        assert res_1["fio"] == "Aboba 210"
+
+        interface = await BaseRedisInterface(UserProfileSchemas,
+                                             UserFilters,
+                                             serializer=BlobSerializer()).migrate()
+        await interface.create(UserProfileSchemas(**{
+            "id": 211,
+            "tg_id": 211,
+            "fio": "Aboba 211",
+            "group": "XD 211",
+            "allow": True,
+            "about": "About 211"
+        }))
+
+        res_2 = await UserProfileSchemas.db().hgetall(UserProfileSchemas.make_primary_key(211))
+        assert sorted(res_2) == ["__blob", "allow", "fio", "group", "id", "pk", "tg_id"]
+
+        res_3 = await interface.get_by_ids([211])
+        assert res_3[211].about == "About 211"
+        assert res_3[211].note == None
+
+        await interface.delete_by_ids([211])
+        await BaseRedisInterface(UserSchemas, UserFilters).delete_by_ids([210])
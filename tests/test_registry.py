@@ -0,0 +1,53 @@
+import pytest
+
+from database.interfaces.registry import CRUDRegistry
+from database.models.user import UserModel
+from database.session import get_async_session
+from .conftest import clear_all
+from .schemas.user import *
+
+
+@pytest.mark.run(order=4)
+class TestRegistry:
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_register(self):
+        registry = CRUDRegistry()
+        registry.register(UserModel, UserSchemas, UserCreate, UserUpdate, UserFilters)
+        assert UserModel in registry
+
+        with pytest.raises(ValueError):
+            registry.register(UserModel, UserSchemas, UserCreate, UserUpdate, UserFilters)
+
+        async with get_async_session() as session:
+            with pytest.raises(RuntimeError):
+                registry.bind(UserModel, session)
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_bind(self):
+        clear_all()
+        registry = CRUDRegistry()
+        prepared = registry.register(UserModel, UserSchemas, UserCreate, UserUpdate, UserFilters)
+        await registry.startup()
+
+        async with get_async_session() as session:
+            interface = registry.bind(UserModel, session)
+            assert interface is not prepared
+            assert interface.redis is prepared.redis
+            assert interface.sql.session is session
+
+            await interface.create(UserCreate(**{
+                "tg_id": 7,
+                "fio": "Aboba_7",
+                "group": "XD_7",
+                "allow": True
+            }))
+            await session.commit()
+
+        async with get_async_session() as session:
+            interface = registry.bind(UserModel, session)
+            res_1 = await interface.get_one_or_none(tg_id=7)
+            assert res_1 != None
+            assert res_1.fio == "Aboba_7"
+
+        await registry.shutdown()
+        assert registry.started == False
@@ -0,0 +1,46 @@
+import importlib.util
+
+import pytest
+
+from database.interfaces.serializers import BlobSerializer
+
+DOCUMENT = {"pk": "1", "id": 1, "tg_id": 1, "fio": "Aboba 1 " * 50, "allow": True}
+
+
+class TestBlobSerializer:
+    def test_json(self):
+        serializer = BlobSerializer()
+        data = serializer.dumps(DOCUMENT)
+        assert isinstance(data, bytes)
+        assert serializer.loads(data) == DOCUMENT
+
+    def test_compression(self):
+        serializer = BlobSerializer(compression="zlib", min_size=64)
+        data = serializer.dumps(DOCUMENT)
+        assert len(data) < len(BlobSerializer().dumps(DOCUMENT))
+        assert serializer.loads(data) == DOCUMENT
+
+        small = {"id": 1}
+        assert serializer.loads(serializer.dumps(small)) == small
+
+    @pytest.mark.parametrize("format, compression, package", [
+        ("orjson", None, "orjson"),
+        ("msgpack", None, "msgpack"),
+        ("json", "zstd", "zstandard"),
+        ("json", "lz4", "lz4"),
+    ])
+    def test_optional(self, format, compression, package):
+        if importlib.util.find_spec(package) is None:
+            with pytest.raises(ImportError):
+                BlobSerializer(format=format, compression=compression)
+            return
+
+        serializer = BlobSerializer(format=format, compression=compression, min_size=0)
+        assert serializer.loads(serializer.dumps(DOCUMENT)) == DOCUMENT
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            BlobSerializer(format="xml")
+
+        with pytest.raises(ValueError):
+            BlobSerializer(compression="gzip")
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from database.interfaces.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_do(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        async def query():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 42
+
+        res = await asyncio.gather(*[single_flight.do(("tg_id", 1), query) for _ in range(10)])
+        assert res == [42] * 10
+        assert len(calls) == 1
+        assert len(single_flight) == 0
+
+        await single_flight.do(("tg_id", 1), query)
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_error(self):
+        single_flight = SingleFlight()
+
+        async def query():
+            await asyncio.sleep(0.01)
+            raise ValueError("query failed")
+
+        res = await asyncio.gather(*[single_flight.do("key", query) for _ in range(3)],
+                                   return_exceptions=True)
+        assert all(isinstance(item, ValueError) for item in res)
+        assert len(single_flight) == 0
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_cancel(self):
+        single_flight = SingleFlight()
+
+        async def query():
+            await asyncio.sleep(0.01)
+            return 42
+
+        leader = asyncio.ensure_future(single_flight.do("key", query))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(single_flight.do("key", query))
+        await asyncio.sleep(0)
+        leader.cancel()
+        assert await follower == 42
+        assert leader.cancelled() == True
+        assert len(single_flight) == 0
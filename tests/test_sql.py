@@ -8,6 +8,95 @@ from .conftest import clear_all
 from .schemas.user import *
 
 
+class EmptyResult:
+    def mappings(self):
+        return self
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return []
+
+
+class RecordingSQLInterface(BaseSQLInterface):
+    async def query_execute(self, query=None, params=None):
+        self.executed.append((query, params))
+        return EmptyResult()
+
+
+class TestSQLStatementCache:
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_statement_cache(self):
+        interface = RecordingSQLInterface(None,
+                                          UserModel,
+                                          UserSchemas,
+                                          UserCreate,
+                                          UserUpdate,
+                                          UserFilters)
+        interface.executed = []
+
+        await interface.get_ids(limit=5, offset=10, tg_id=1)
+        await interface.get_ids(limit=7, offset=0, tg_id=2)
+        (query_1, params_1), (query_2, params_2) = interface.executed
+        assert query_1 is query_2
+        assert params_1 == {"filter_tg_id": 1, "offset": 10, "limit": 5}
+        assert params_2 == {"filter_tg_id": 2, "offset": 0, "limit": 7}
+        assert ":filter_tg_id" in str(query_1)
+        assert ":offset" in str(query_1)
+        assert ":limit" in str(query_1)
+
+        await interface.get_all(limit=3, fio="Aboba")
+        await interface.get_all(limit=4, fio="Other")
+        assert interface.executed[2][0] is interface.executed[3][0]
+        assert interface.executed[3][1] == {"filter_fio": "Other", "offset": 0, "limit": 4}
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_statement_cache_where_filter(self):
+        interface = RecordingSQLInterface(None,
+                                          UserModel,
+                                          UserSchemas,
+                                          UserCreate,
+                                          UserUpdate,
+                                          UserFilters)
+        interface.executed = []
+
+        await interface.get_ids(tg_id=1)
+        template = str(interface.executed[0][0])
+        cache_size = len(BaseSQLInterface._statement_cache)
+
+        await interface.get_ids(UserModel.fio == "Aboba", tg_id=1)
+        await interface.get_ids(tg_id=1)
+        assert interface.executed[1][0] is not interface.executed[0][0]
+        assert "users.fio" in str(interface.executed[1][0])
+        assert interface.executed[2][0] is interface.executed[0][0]
+        assert str(interface.executed[2][0]) == template
+        assert "users.fio" not in template
+        assert len(BaseSQLInterface._statement_cache) == cache_size
+
+
+
+class TestSQLValidation:
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_upsert_many_conflict_columns(self):
+        interface = BaseSQLInterface(None,
+                                     UserModel,
+                                     UserSchemas,
+                                     UserCreate,
+                                     UserUpdate,
+                                     UserFilters)
+
+        assert set(BaseSQLInterface.compile_unique_keys(UserModel)) == {frozenset(["id"]), frozenset(["tg_id"])}
+
+        with pytest.raises(ValueError):
+            await interface.upsert_many([], [])
+        with pytest.raises(ValueError):
+            await interface.upsert_many([], ["id"])
+        with pytest.raises(ValueError):
+            await interface.upsert_many([], ["fio"])
+        with pytest.raises(ValueError):
+            await interface.upsert_many([], ["tg_id", "fio"])
+
 @pytest.mark.run(order=1)
 class TestSQLInterface:
     @pytest.mark.asyncio(loop_scope="session")
@@ -159,6 +248,50 @@ class TestSQLInterface:
             )
             assert len(res_7) == 3
 
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_iter_all(self):
+        async with get_async_session() as session:
+            interface = BaseSQLInterface(session,
+                                         UserModel,
+                                         UserSchemas,
+                                         UserCreate,
+                                         UserUpdate,
+                                         UserFilters)
+
+            res_1 = [chunk async for chunk in interface.iter_all(chunk_size=2)]
+            assert [len(chunk) for chunk in res_1] == [2, 1]
+            assert sorted(item.tg_id for chunk in res_1 for item in chunk) == [0, 1, 54]
+
+            res_2 = [chunk async for chunk in interface.iter_all(
+                where_filter=UserModel.tg_id >= 1,
+                chunk_size=10
+            )]
+            assert len(res_2) == 1
+            assert sorted(item.tg_id for item in res_2[0]) == [1, 54]
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_get_columns(self):
+        async with get_async_session() as session:
+            interface = BaseSQLInterface(session,
+                                         UserModel,
+                                         UserSchemas,
+                                         UserCreate,
+                                         UserUpdate,
+                                         UserFilters,
+                                         trust_db_rows=True)
+
+            res_1 = await interface.get_all(UserModel.tg_id >= 1, columns=["id", "tg_id"])
+            assert sorted(item.tg_id for item in res_1) == [1, 54]
+            assert "fio" not in res_1[0].model_fields_set
+
+            res_2 = await interface.get_one_or_none(tg_id=1)
+            assert res_2 != None
+            assert res_2.fio != None
+            assert res_2.allow is True
+
+            with pytest.raises(KeyError):
+                await interface.get_all(columns=["unknown"])
+
     @pytest.mark.asyncio(loop_scope="session")
     async def test_update(self):
         async with get_async_session() as session:
@@ -256,3 +389,142 @@ class TestSQLInterface:
             assert res_2 == None
 
             await session.commit()
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_create_returning(self):
+        async with get_async_session() as session:
+            interface = BaseSQLInterface(session,
+                                         UserModel,
+                                         UserSchemas,
+                                         UserCreate,
+                                         UserUpdate,
+                                         UserFilters)
+
+            res_1 = await interface.create(
+                create_object=[
+                    UserCreate(**{
+                        "tg_id": 100,
+                        "fio": "Aboba_100",
+                        "group": "XD_100",
+                        "allow": True
+                    }),
+                    UserCreate(**{
+                        "tg_id": 101,
+                        "fio": "Aboba_101",
+                        "group": "XD_101",
+                        "allow": False
+                    })
+                ],
+                returning=True
+            )
+            assert len(res_1) == 2
+            assert res_1[0].id != None
+            assert res_1[0].tg_id == 100
+            assert res_1[1].tg_id == 101
+            assert res_1[1].allow == False
+
+            res_2 = await interface.create(
+                UserCreate(**{
+                    "tg_id": 102,
+                    "fio": "Aboba_102",
+                    "group": "XD_102",
+                    "allow": True
+                }),
+                returning=True
+            )
+            assert res_2.id != None
+            assert res_2.fio == "Aboba_102"
+
+            await session.commit()
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_upsert_many(self):
+        async with get_async_session() as session:
+            interface = BaseSQLInterface(session,
+                                         UserModel,
+                                         UserSchemas,
+                                         UserCreate,
+                                         UserUpdate,
+                                         UserFilters)
+
+            res_1 = await interface.upsert_many(
+                upsert_object=[
+                    UserCreate(**{
+                        "tg_id": 100,
+                        "fio": "Upsert_100",
+                        "group": "XD_100",
+                        "allow": False
+                    }),
+                    UserCreate(**{
+                        "tg_id": 200,
+                        "fio": "Upsert_200",
+                        "group": "XD_200",
+                        "allow": True
+                    })
+                ],
+                conflict_columns=["tg_id"]
+            )
+            assert len(res_1) == 2
+            await session.commit()
+
+            res_2 = await interface.get_one_or_none(
+                tg_id=100,
+            )
+            assert res_2 != None
+            assert res_2.fio == "Upsert_100"
+            assert res_2.allow == False
+
+            res_3 = await interface.get_one_or_none(
+                tg_id=200,
+            )
+            assert res_3 != None
+            assert res_3.fio == "Upsert_200"
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_update_returning(self):
+        async with get_async_session() as session:
+            interface = BaseSQLInterface(session,
+                                         UserModel,
+                                         UserSchemas,
+                                         UserCreate,
+                                         UserUpdate,
+                                         UserFilters)
+
+            res_1 = await interface.update(
+                update_object={
+                    "group": "Returning"
+                },
+                where_filter=UserModel.tg_id >= 100,
+                returning=True
+            )
+            assert len(res_1) == 4
+            for item in res_1:
+                assert item.tg_id >= 100
+                assert item.group == "Returning"
+
+            await session.commit()
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_delete_returning(self):
+        async with get_async_session() as session:
+            interface = BaseSQLInterface(session,
+                                         UserModel,
+                                         UserSchemas,
+                                         UserCreate,
+                                         UserUpdate,
+                                         UserFilters)
+
+            res_1 = await interface.soft_delete(
+                returning=True,
+                tg_id=200
+            )
+            assert len(res_1) == 1
+
+            res_2 = await interface.delete(
+                where_filter=UserModel.tg_id >= 100,
+                returning=True
+            )
+            assert len(res_2) == 3
+            assert res_1[0] not in res_2
+
+            await session.commit()
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from database.interfaces.write_behind import WriteBehindQueue
+from .schemas.user import *
+
+
+class TestWriteBehindQueue:
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_put_drain(self):
+        batches = []
+
+        async def writer(objects):
+            await asyncio.sleep(0.01)
+            batches.append(objects)
+
+        queue = WriteBehindQueue(writer, max_size=100, batch_size=10, concurrency=2)
+        await queue.put([make_user(user_id) for user_id in range(25)])
+        await queue.drain()
+
+        assert len(queue) == 0
+        assert queue.in_flight == 0
+        assert sum(len(batch) for batch in batches) == 25
+        assert max(len(batch) for batch in batches) <= 10
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_coalesce(self):
+        written = {}
+
+        async def writer(objects):
+            for obj in objects:
+                written[obj.id] = obj.fio
+
+        queue = WriteBehindQueue(writer, max_size=100, batch_size=100, concurrency=1)
+        await queue.put([make_user(1, fio="old"), make_user(2), make_user(1, fio="new")])
+        assert len(queue) == 2
+        await queue.drain()
+
+        assert written == {1: "new", 2: "Aboba 2"}
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_backpressure(self):
+        running = []
+
+        async def writer(objects):
+            running.append(1)
+            assert len(running) <= 2
+            await asyncio.sleep(0.01)
+            running.pop()
+
+        queue = WriteBehindQueue(writer, max_size=5, batch_size=2, concurrency=2)
+        await queue.put([make_user(user_id) for user_id in range(30)])
+        assert len(queue) <= 5
+        await queue.close()
+
+        assert len(queue) == 0
+        with pytest.raises(RuntimeError):
+            await queue.put(make_user(0))
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_writer_error(self):
+        async def writer(objects):
+            raise ConnectionError("redis is down")
+
+        queue = WriteBehindQueue(writer)
+        await queue.put(make_user(0))
+        await queue.drain()
+        assert len(queue) == 0
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_discard(self):
+        written = {}
+
+        async def writer(objects):
+            await asyncio.sleep(0.01)
+            for obj in objects:
+                written[obj.id] = obj.fio
+
+        queue = WriteBehindQueue(writer, max_size=100, batch_size=2, concurrency=1)
+        await queue.put([make_user(user_id) for user_id in range(4)])
+        await asyncio.sleep(0)
+        assert queue.in_flight == 2
+
+        await queue.discard([1, 3])
+        assert sorted(written) == [0, 1]
+        assert len(queue) == 0
+
+        await queue.drain()
+        assert sorted(written) == [0, 1, 2]
+
+        await queue.put([make_user(5), make_user(6)])
+        await queue.discard([5, 6])
+        await queue.drain()
+        assert sorted(written) == [0, 1, 2]
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_bind(self):
+        async def writer(objects):
+            pass
+
+        async def other_writer(objects):
+            pass
+
+        queue = WriteBehindQueue()
+        with pytest.raises(RuntimeError):
+            await queue.put(make_user(0))
+
+        queue.bind(writer)
+        queue.bind(writer)
+        assert queue.writer == writer
+        with pytest.raises(ValueError):
+            queue.bind(other_writer)